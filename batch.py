@@ -0,0 +1,202 @@
+"""
+Headless batch runner for the SDLC graph.
+
+Reads a JSONL file of requirements, runs every line as its own graph thread on a worker pool
+and answers each human review pause from an approval policy instead of the Streamlit UI.
+Artifacts of each thread are written to `<output>/<id>/` and one result line per thread is
+appended to `<output>/results.jsonl`.
+
+Input lines:
+    {"id": "loan-portal", "requirements": "A home loan application portal ..."}
+`id` defaults to the line number, `body` is accepted in place of `requirements`.
+
+Policy file (JSON), keyed by human review node, every unlisted node uses "default":
+    {
+        "default": "Approve",
+        "Human Code Review": {"status": "Denied", "feedback": "Add type hints", "rounds": 1},
+        "Human Security Review": "llm"
+    }
+"Approve" approves, a "Denied" rule sends its feedback back for `rounds` visits and approves
+afterwards, and "llm" keeps the status the automated reviewer wrote (security review, QA).
+
+Usage:
+    python batch.py requirements.jsonl --workers 8
+    python batch.py requirements.jsonl --policy policy.json --output overnight --resume
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import sdlc_graph
+from code_parser import parse_files_from_response
+from metrics import metrics
+
+
+AUTO_APPROVE_POLICY = {"default": "Approve"}
+
+
+def load_requirements(path: str):
+    """Returns [{"id", "requirements"}] for every non-empty line of a JSONL file."""
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            requirements = record.get("requirements") or record.get("body") or ""
+            item_id = str(record.get("id") or record.get("request_id") or line_number)
+            items.append({"id": item_id, "requirements": requirements})
+    return items
+
+
+def load_policy(path: str = None) -> dict:
+    if not path:
+        return AUTO_APPROVE_POLICY
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def review_decision(policy: dict, node: str, visit: int, state: dict, max_rounds: int):
+    """
+    Returns the (status, feedback) to apply at a human review pause, feedback is None when the
+    reviewer's current feedback should be kept.
+    """
+    rule = policy.get(node, policy.get("default", "Approve"))
+    if isinstance(rule, str):
+        rule = {"status": rule}
+    status = rule.get("status", "Approve")
+
+    # Never loop forever on a node, whatever the policy or the automated reviewer says
+    if visit > max_rounds:
+        return "Approve", None
+    if status == "llm":
+        status_field, _ = sdlc_graph.REVIEW_FIELDS[node]
+        return state.get(status_field) or "Approve", None
+    if status == "Denied" and visit <= rule.get("rounds", 1):
+        return "Denied", rule.get("feedback", "Please revise.")
+    return "Approve", None
+
+
+def feedback_update(state: dict, feedback_field: str, feedback: str):
+    # Most review feedback fields are lists, the security review one is a plain string
+    return {feedback_field: [feedback] if isinstance(state.get(feedback_field), list) else feedback}
+
+
+def save_artifacts(state: dict, output_dir: str):
+    """Writes the artifacts of one finished thread to its own directory."""
+    sdlc_graph.save_user_stories_to_txt(state, output_dir=output_dir)
+    sdlc_graph.save_design_document_to_word(state, output_dir=output_dir)
+    if state.get("code"):
+        sdlc_graph.save_files(parse_files_from_response(state["code"]), output_dir=os.path.join(output_dir, "generated_code"))
+    if state.get("test_cases"):
+        sdlc_graph.save_test_cases_to_files(state["test_cases"], output_dir=os.path.join(output_dir, "test_cases"))
+
+
+def safe_dirname(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_.-]", "_", name) or "item"
+
+
+def run_item(item: dict, policy: dict, output_dir: str, max_rounds: int) -> dict:
+    """Runs one requirement from start to deployment (or the last review) and returns its result line."""
+    graph = sdlc_graph.get_graph()
+    thread_id = str(uuid.uuid4())
+    # Batch threads yield to interactive Streamlit sessions in llm_scheduler
+    config = {"configurable": {"thread_id": thread_id, "priority": "batch"}}
+    visits, reviews = {}, []
+    start = time.perf_counter()
+    result = {"id": item["id"], "thread_id": thread_id}
+
+    try:
+        graph.invoke(sdlc_graph.initial_state(item["requirements"]), config)
+        while next_nodes := graph.get_state(config).next:
+            node = next_nodes[0]
+            state = graph.get_state(config).values
+            visits[node] = visits.get(node, 0) + 1
+            status, feedback = review_decision(policy, node, visits[node], state, max_rounds)
+            status_field, feedback_field = sdlc_graph.REVIEW_FIELDS[node]
+            update = {status_field: status}
+            if feedback is not None:
+                update.update(feedback_update(state, feedback_field, feedback))
+            reviews.append({"node": node, "status": status})
+            graph.update_state(config, update, as_node=node)
+            graph.invoke(None, config)
+
+        state = graph.get_state(config).values
+        item_dir = os.path.join(output_dir, safe_dirname(item["id"]))
+        save_artifacts(state, item_dir)
+        result.update({
+            "status": "deployed" if state.get("deployment") == "deployed" else "finished",
+            "output_dir": item_dir,
+        })
+    except Exception as e:
+        traceback.print_exc()
+        result.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+
+    summary = metrics.thread_summary(thread_id)
+    result.update({
+        "seconds": round(time.perf_counter() - start, 3),
+        "reviews": reviews,
+        "llm_calls": sum(values["llm_calls"] for values in summary.values()),
+        "prompt_tokens": sum(values["prompt_tokens"] for values in summary.values()),
+        "completion_tokens": sum(values["completion_tokens"] for values in summary.values()),
+    })
+    return result
+
+
+def completed_ids(results_path: str):
+    if not os.path.exists(results_path):
+        return set()
+    with open(results_path, encoding="utf-8") as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    return {result["id"] for result in results if result.get("status") != "error"}
+
+
+def run_batch(items, policy: dict, output_dir: str, workers: int, max_rounds: int, resume: bool = False):
+    """Runs every item on a worker pool, appending each result to results.jsonl as soon as it finishes."""
+    os.makedirs(output_dir, exist_ok=True)
+    results_path = os.path.join(output_dir, "results.jsonl")
+    if resume:
+        done = completed_ids(results_path)
+        items = [item for item in items if item["id"] not in done]
+        print(f"⏭️ Skipping {len(done)} completed items, {len(items)} left")
+
+    write_lock = threading.Lock()
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_item, item, policy, output_dir, max_rounds) for item in items]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            with write_lock, open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+            icon = "✅" if result["status"] != "error" else "❌"
+            print(f"{icon} [{len(results)}/{len(items)}] {result['id']}: {result['status']} in {result['seconds']}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many requirements through the SDLC graph without the UI.")
+    parser.add_argument("input", help="JSONL file with one {\"id\", \"requirements\"} object per line")
+    parser.add_argument("--policy", help="JSON approval policy, every review is approved when omitted")
+    parser.add_argument("--output", default="batch_output", help="Directory for artifacts and results.jsonl")
+    parser.add_argument("--workers", type=int, default=4, help="Threads running concurrently")
+    parser.add_argument("--max-rounds", type=int, default=3, help="Visits of one review node after which it is approved")
+    parser.add_argument("--resume", action="store_true", help="Skip items already in results.jsonl")
+    args = parser.parse_args()
+
+    items = load_requirements(args.input)
+    start = time.perf_counter()
+    results = run_batch(items, load_policy(args.policy), args.output, args.workers, args.max_rounds, args.resume)
+    failed = sum(result["status"] == "error" for result in results)
+    print(f"🏁 {len(results) - failed} succeeded, {failed} failed in {time.perf_counter() - start:.1f}s, "
+          f"results in {os.path.join(args.output, 'results.jsonl')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark of the SDLC graph with a deterministic local fake LLM.
+
+Drives N concurrent threads from requirements through every human approval to deployment
+and reports throughput, p50/p99 latency per node (split into LLM time and orchestration
+overhead) and memory per thread. Artifacts are written to a temporary directory.
+
+Usage:
+    python benchmark.py --threads 20 --latency 0.2
+    python benchmark.py --threads 50 --mode async --files 20 --json bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# The fake model replaces the inference client, these only keep the graph config complete
+os.environ.setdefault("LLAMA_MODEL", "fake-sdlc")
+os.environ.setdefault("LLAMA_URL", "http://localhost:0/v1")
+os.environ.setdefault("LLAMA_API_KEY", "benchmark")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def run_thread(sdlc_graph, requirements: str) -> str:
+    """Runs one pipeline thread, approving every human review pause, and returns its thread_id."""
+    graph = sdlc_graph.get_graph()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    graph.invoke(sdlc_graph.initial_state(requirements), config)
+    while next_nodes := graph.get_state(config).next:
+        node = next_nodes[0]
+        status_field, _ = sdlc_graph.REVIEW_FIELDS[node]
+        graph.update_state(config, {status_field: "Approve"}, as_node=node)
+        graph.invoke(None, config)
+    return config["configurable"]["thread_id"]
+
+
+async def arun_thread(sdlc_graph, requirements: str) -> str:
+    graph = sdlc_graph.get_async_graph()
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    await graph.ainvoke(sdlc_graph.initial_state(requirements), config)
+    while next_nodes := (await graph.aget_state(config)).next:
+        node = next_nodes[0]
+        status_field, _ = sdlc_graph.REVIEW_FIELDS[node]
+        await graph.aupdate_state(config, {status_field: "Approve"}, as_node=node)
+        await graph.ainvoke(None, config)
+    return config["configurable"]["thread_id"]
+
+
+async def arun_all(sdlc_graph, requirements: list):
+    return await asyncio.gather(*(arun_thread(sdlc_graph, r) for r in requirements))
+
+
+def run_benchmark(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="sdlc-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        import sdlc_graph
+        from fake_llm import FakeSDLCChatModel
+        from metrics import metrics
+
+        sdlc_graph.llm = FakeSDLCChatModel(
+            latency=args.latency, files=args.files, lines_per_file=args.lines_per_file,
+            test_cases=args.test_cases,
+        )
+        requirements = [f"Benchmark requirement {i}: a home loan application portal" for i in range(args.threads)]
+
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        if args.mode == "async":
+            thread_ids = asyncio.run(arun_all(sdlc_graph, requirements))
+        else:
+            with ThreadPoolExecutor(max_workers=args.workers or args.threads) as pool:
+                thread_ids = list(pool.map(lambda r: run_thread(sdlc_graph, r), requirements))
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    per_node = {}
+    for thread_id in thread_ids:
+        for node, values in metrics.thread_summary(thread_id).items():
+            samples = per_node.setdefault(node, {"seconds": [], "llm_seconds": [], "overhead_seconds": []})
+            samples["seconds"].append(values["seconds"])
+            samples["llm_seconds"].append(values["llm_seconds"])
+            samples["overhead_seconds"].append(values["seconds"] - values["llm_seconds"])
+
+    return {
+        "mode": args.mode,
+        "threads": args.threads,
+        "llm_latency": args.latency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_pipelines_per_second": round(args.threads / elapsed, 3),
+        "memory_per_thread_kib": round((current - baseline) / args.threads / 1024, 1),
+        "peak_memory_mib": round(peak / 1024 / 1024, 2),
+        "nodes": {
+            node: {
+                f"{metric}_{name}": round(percentile(samples[metric], pct), 4)
+                for metric in ("seconds", "llm_seconds", "overhead_seconds")
+                for name, pct in (("p50", 50), ("p99", 99))
+            }
+            for node, samples in per_node.items()
+        },
+    }
+
+
+def print_report(report: dict):
+    print(f"🏁 {report['threads']} threads ({report['mode']}), fake LLM latency {report['llm_latency']}s")
+    print(f"   elapsed {report['elapsed_seconds']}s, throughput {report['throughput_pipelines_per_second']} pipelines/s")
+    print(f"   memory {report['memory_per_thread_kib']} KiB/thread, peak {report['peak_memory_mib']} MiB")
+    print(f"\n{'Node':32} {'p50 s':>9} {'p99 s':>9} {'LLM p50':>9} {'ovh p50':>9} {'ovh p99':>9}")
+    for node, values in report["nodes"].items():
+        print(f"{node:32} {values['seconds_p50']:9.4f} {values['seconds_p99']:9.4f} "
+              f"{values['llm_seconds_p50']:9.4f} {values['overhead_seconds_p50']:9.4f} {values['overhead_seconds_p99']:9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SDLC graph with a local fake LLM.")
+    parser.add_argument("--threads", type=int, default=10, help="Concurrent pipeline threads")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync", help="Drive `graph` from a thread pool or `async_graph` on one event loop")
+    parser.add_argument("--workers", type=int, default=0, help="Thread pool size in sync mode, defaults to --threads")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per LLM call")
+    parser.add_argument("--files", type=int, default=5, help="Files per generated code response")
+    parser.add_argument("--lines-per-file", type=int, default=40, help="Lines per generated file")
+    parser.add_argument("--test-cases", type=int, default=10, help="Test cases per test case response")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the graph's console output")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    report = run_benchmark(args)
+    print_report(report)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report saved to: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
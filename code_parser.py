@@ -0,0 +1,140 @@
+import re
+
+
+# Header of a file block, complete only once the newline after the opening fence has arrived:
+# Filename: user_interface.py
+# Code:
+# ```python
+FILENAME = r"[\w_]+\.py"
+FILE_HEADER_PATTERN = re.compile(r"Filename:\s*(?P<filename>" + FILENAME + r")\s*Code:\s*```(?:python)?[^\S\n]*\n")
+HEADER_START = "Filename:"
+FENCE = "```"
+
+
+def is_valid_filename(filename: str) -> bool:
+    """True for names a file header can carry, i.e. plain `snake_case.py` without a directory."""
+    return re.fullmatch(FILENAME, filename) is not None
+
+
+class StreamingFileParser:
+    """
+    Single-pass, incremental parser for LLM output containing multiple Python files
+    formatted with 'Filename:' and 'Code:' markers.
+
+    Feed it token chunks as they arrive; every file block is emitted as soon as its closing
+    fence is seen, so files can be written while the model is still generating the rest.
+    Consumed text is dropped from the buffer and no character is scanned twice.
+
+    Args:
+        on_file (callable): Called with each completed {'filename', 'code'} dict.
+    """
+
+    def __init__(self, on_file=None):
+        self.on_file = on_file
+        self.files = []
+        self.buffer = ""
+        self.code_start = None  # offset of the code of the open block, None while looking for a header
+        self.filename = None
+        self.scan_from = 0
+
+    def feed(self, chunk: str):
+        """Consumes a chunk of the response and returns the file blocks it completed."""
+        if not chunk:
+            return []
+        self.buffer += chunk
+        completed = []
+
+        while True:
+            if self.code_start is None:
+                match = FILE_HEADER_PATTERN.search(self.buffer, self.scan_from)
+                if not match:
+                    # Only the last header start, or a prefix of one at the end, can still complete
+                    start = self.buffer.rfind(HEADER_START, self.scan_from)
+                    self.scan_from = start if start != -1 else max(self.scan_from, len(self.buffer) - len(HEADER_START) + 1)
+                    break
+                self.filename = match.group("filename").strip()
+                self.code_start = self.scan_from = match.end()
+
+            end = self.buffer.find(FENCE, self.scan_from)
+            if end == -1:
+                # A fence may be split across chunks, rescan only its possible prefix next time
+                self.scan_from = max(self.code_start, len(self.buffer) - len(FENCE) + 1)
+                break
+
+            completed.append(self._emit(self.filename, self.buffer[self.code_start:end]))
+            self.buffer = self.buffer[end + len(FENCE):]
+            self.code_start = self.filename = None
+            self.scan_from = 0
+
+        return completed
+
+    def close(self):
+        """
+        Finishes parsing and returns every file block. When no named block was found, a single
+        unnamed code block is saved as main.py.
+        """
+        if not self.files:
+            fallback_match = re.search(r"```(?:python)?\s*(.*?)```", self.buffer, re.DOTALL)
+            if fallback_match:
+                self._emit("main.py", fallback_match.group(1))  # default fallback
+            else:
+                print("❌ No code blocks found in response.")
+        return self.files
+
+    def _emit(self, filename: str, code: str):
+        file = {"filename": filename, "code": code.strip()}
+        self.files.append(file)
+        if self.on_file:
+            self.on_file(file)
+        return file
+
+
+def parse_files_from_response(response_text: str):
+    """
+    Parses code blocks from LLM-generated response containing multiple Python files
+    formatted with 'Filename:' and 'Code:' markers.
+
+    Returns:
+        List[Dict] - Each dict contains 'filename' and 'code' keys.
+    """
+    parser = StreamingFileParser()
+    parser.feed(response_text)
+    return parser.close()
+
+
+def render_files(file_blocks):
+    """
+    Inverse of `parse_files_from_response`: renders file blocks back into the
+    Filename / Code format used for `state['code']`.
+    """
+    return "\n\n".join(
+        f"Filename: {file['filename']}\nCode:\n```python\n{file['code']}\n```"
+        for file in file_blocks
+    )
+
+
+def file_spans(response_text: str):
+    """(start, end, filename) of every file block, found the same way `StreamingFileParser` finds them."""
+    spans, position = [], 0
+    while (match := FILE_HEADER_PATTERN.search(response_text, position)):
+        end = response_text.find(FENCE, match.end())
+        if end == -1:
+            break
+        spans.append((match.start(), end + len(FENCE), match.group("filename").strip()))
+        position = end + len(FENCE)
+    return spans
+
+
+def replace_files(response_text: str, file_blocks):
+    """
+    Returns `response_text` with the blocks of `file_blocks` replaced in place and files it does
+    not contain appended. Everything else is kept as is, e.g. a requirements.txt block.
+    """
+    replacements = {file["filename"]: file for file in file_blocks}
+    parts, position = [], 0
+    for start, end, filename in file_spans(response_text):
+        if filename in replacements:
+            parts += [response_text[position:start], render_files([replacements.pop(filename)])]
+            position = end
+    parts.append(response_text[position:])
+    return "\n\n".join(part for part in ("".join(parts).rstrip(), render_files(replacements.values())) if part)
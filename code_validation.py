@@ -0,0 +1,132 @@
+import ast
+import os
+import re
+import sys
+
+import static_analysis
+
+
+# Third-party packages the generated project depends on, comma separated import names, e.g.
+# "flask,sqlalchemy,jose". Together with a generated requirements.txt they turn on the check of
+# third-party imports; without either, only imports of generated modules are verified.
+ALLOWED_PACKAGES = {name.strip() for name in os.getenv("SDLC_ALLOWED_PACKAGES", "").split(",") if name.strip()}
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+REQUIREMENTS_BLOCK_PATTERN = re.compile(r"Filename:\s*requirements\.txt\s*Code:\s*```[^\n]*\n(?P<body>.*?)```", re.DOTALL)
+REQUIREMENT_NAME_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def module_name(filename: str) -> str:
+    return filename[:-3] if filename.endswith(".py") else filename
+
+
+def package_key(name: str) -> str:
+    """Compares distribution and import names: `Flask-Login` and `flask_login` match."""
+    key = re.sub(r"[-.]", "_", name.lower())
+    return key[len("python_"):] if key.startswith("python_") else key
+
+
+def declared_packages(code: str):
+    """
+    Import keys of the packages the project declares: a requirements.txt block of the code
+    response plus SDLC_ALLOWED_PACKAGES. None when nothing is declared.
+    """
+    names = set(ALLOWED_PACKAGES)
+    for block in REQUIREMENTS_BLOCK_PATTERN.finditer(str(code)):
+        for line in block.group("body").splitlines():
+            match = REQUIREMENT_NAME_PATTERN.match(line.split("#")[0])
+            if match:
+                names.add(match.group(1))
+    return {package_key(name) for name in names} if names else None
+
+
+def optional_imports(tree):
+    """Imports guarded by `try: ... except ImportError:`, the code handles them being missing."""
+    guarded = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Try):
+            continue
+        names = set()
+        for handler in node.handlers:
+            types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+            names.update(getattr(t, "id", None) for t in types if t is not None)
+            if handler.type is None:
+                names.add("BaseException")
+        if names & IMPORT_ERRORS:
+            guarded.update(id(child) for statement in node.body for child in ast.walk(statement))
+    return guarded
+
+
+def check_imports(tree, filename: str, modules: dict, packages=None):
+    """
+    Imports of generated modules must name something the module defines. Other imports must be
+    the standard library or a declared package, checked only when `packages` is given: the
+    project targets its own environment, not the one running this pipeline.
+    """
+    problems, reported = [], set()
+    guarded = optional_imports(tree)
+    for node in ast.walk(tree):
+        if id(node) in guarded:
+            continue
+        if isinstance(node, ast.Import):
+            targets = [(alias.name, None) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            targets = [(node.module, alias.name) for alias in node.names]
+        else:
+            continue
+        for module, name in targets:
+            top = module.split(".")[0]
+            if top in modules:
+                if name and name != "*" and module == top and name not in modules[top]:
+                    problems.append((node.lineno, f"imports `{name}` from `{top}`, which does not define it"))
+            elif (packages is not None and top not in reported and top not in sys.stdlib_module_names
+                  and package_key(top) not in packages):
+                # One problem per package, however many names are imported from it
+                reported.add(top)
+                problems.append((node.lineno, f"imports `{top}`, which is neither a generated module nor a declared package"))
+    return problems
+
+
+def validate_files(files, packages=None):
+    """
+    Local checks of generated files that need no LLM: the file compiles, its imports resolve
+    against the other generated files (and the declared `packages`, see `declared_packages`),
+    and every name it uses is imported or defined.
+
+    Returns:
+        {filename: ["line 3: ...", ...]} for every file with problems.
+    """
+    trees, issues = {}, {}
+    for file in files:
+        try:
+            # compile() also reports errors ast.parse accepts, e.g. `return` outside a function
+            compile(file["code"], file["filename"], "exec", dont_inherit=True)
+            trees[file["filename"]] = ast.parse(file["code"], filename=file["filename"])
+        except (SyntaxError, ValueError) as e:
+            issues[file["filename"]] = [f"line {getattr(e, 'lineno', 0) or 0}: syntax error: {getattr(e, 'msg', e)}"]
+
+    modules = {module_name(filename): static_analysis.bound_names(tree) for filename, tree in trees.items()}
+    for filename, tree in trees.items():
+        problems = check_imports(tree, filename, modules, packages)
+        problems += [(f["line"], f["message"]) for f in static_analysis.check_undefined_names(tree, filename)]
+        if problems:
+            issues[filename] = [f"line {line}: {message}" for line, message in sorted(problems)]
+    return issues
+
+
+def module_interfaces(files) -> str:
+    """One line per generated module with the top-level names other modules may import."""
+    lines = []
+    for file in files:
+        try:
+            tree = ast.parse(file["code"])
+        except SyntaxError:
+            continue
+        names = []
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.append(node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                names.extend(name for target in targets for name in static_analysis.target_names(target))
+        lines.append(f"- {module_name(file['filename'])}: {', '.join(names) or '(no public names)'}")
+    return "\n".join(lines)
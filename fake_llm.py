@@ -0,0 +1,133 @@
+import asyncio
+import re
+import time
+import typing
+from typing import Any, List
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+
+class FakeSDLCChatModel(BaseChatModel):
+    """
+    Deterministic local chat model producing SDLC-shaped payloads, used to benchmark and
+    exercise the graph without the remote inference endpoint.
+
+    Plain completions return `[Test Case Name]:` blocks when the prompt asks for test cases, a
+    passing pytest file when it asks to convert test cases, and `Filename:` / `Code:` blocks otherwise; structured output calls return a filled-in instance
+    of the requested schema, with every `Literal` status set to its first value ("Approve").
+
+    Attributes:
+        latency (float): Simulated seconds per call, spent before the first streamed chunk.
+        files (int): Number of files in a code response.
+        lines_per_file (int): Lines of code per generated file.
+        test_cases (int): Number of test cases in a test case response.
+        chunk_size (int): Characters per streamed chunk.
+    """
+
+    latency: float = 0.05
+    files: int = 5
+    lines_per_file: int = 40
+    test_cases: int = 10
+    chunk_size: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-sdlc"
+
+    def code_response(self) -> str:
+        blocks = []
+        for i in range(self.files):
+            body = "\n".join(
+                f"def function_{i}_{line}(value):\n    \"\"\"Returns the value.\"\"\"\n    return value"
+                for line in range(max(self.lines_per_file // 3, 1))
+            )
+            blocks.append(f"Filename: module_{i}.py\nCode:\n```python\n{body}\n```")
+        return "\n\n".join(blocks)
+
+    def test_cases_response(self) -> str:
+        return "\n---\n".join(
+            f"[Test Case Name]: Endpoint {i} - valid input\n\n"
+            f"[Description]:\nChecks endpoint {i} with valid input.\n\n"
+            f"[Test Type]: Unit\n\n"
+            f"[Test Steps]:\n1. Send request to /resource/{i}\n2. Receive response\n\n"
+            f"[Expected Result]:\n200 OK"
+            for i in range(self.test_cases)
+        )
+
+    def pytest_response(self, prompt: str) -> str:
+        filename = re.search(r"Filename:\s*(test_\w+\.py)", prompt)
+        tests = "\n\n".join(f"def test_case_{i}():\n    assert module_0.function_0_0({i}) == {i}"
+                              for i in range(self.test_cases))
+        return f"Filename: {filename.group(1) if filename else 'test_generated.py'}\nCode:\n```python\nimport module_0\n\n{tests}\n```"
+
+    def respond(self, messages) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if "runnable pytest tests" in prompt:
+            return self.pytest_response(prompt)
+        return self.test_cases_response() if "[Test Case Name]" in prompt else self.code_response()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages)))])
+
+    def _chunks(self, messages):
+        content = self.respond(messages)
+        return [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)]
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # The whole latency is spent before the first chunk, tiny per-chunk sleeps would overshoot it
+        time.sleep(self.latency)
+        for text in self._chunks(messages):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        for text in self._chunks(messages):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    def fake_value(self, annotation, name: str, index: int = 0):
+        origin = typing.get_origin(annotation)
+        if origin is typing.Literal:
+            return typing.get_args(annotation)[0]
+        if origin in (list, List):
+            item_type = typing.get_args(annotation)[0]
+            if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+                # e.g. the files of a code plan, named like the files of code_response()
+                return [self.structured_response(item_type, i) for i in range(self.files)]
+            return [f"{name} item {i}: " + "lorem ipsum " * 8 for i in range(6)]
+        if name == "generated_code":
+            return self.code_response()
+        if name == "filename":
+            return f"module_{index}.py"
+        return f"{name}: " + "lorem ipsum " * 20
+
+    def structured_response(self, schema, index: int = 0):
+        return schema(**{
+            name: self.fake_value(field.annotation, name, index)
+            for name, field in schema.model_fields.items()
+        })
+
+    def with_structured_output(self, schema, **kwargs: Any):
+        def respond(_prompt_value):
+            time.sleep(self.latency)
+            return self.structured_response(schema)
+
+        async def arespond(_prompt_value):
+            await asyncio.sleep(self.latency)
+            return self.structured_response(schema)
+
+        return RunnableLambda(respond, afunc=arespond)
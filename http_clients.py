@@ -0,0 +1,86 @@
+import atexit
+import importlib.util
+import os
+import ssl
+import threading
+
+import certifi
+import httpx
+
+
+# Connection pool shared by every inference call of the process (graph and chat page)
+HTTP_MAX_CONNECTIONS = int(os.getenv("SDLC_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SDLC_HTTP_MAX_KEEPALIVE", "20"))
+# Idle connections are kept open this long, so pauses between graph nodes reuse them
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SDLC_HTTP_KEEPALIVE_EXPIRY", "120"))
+# Read timeout is generous, a full code generation can take minutes
+HTTP_TIMEOUT = float(os.getenv("SDLC_HTTP_TIMEOUT", "600"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("SDLC_HTTP_CONNECT_TIMEOUT", "10"))
+# HTTP/2 multiplexes concurrent requests over one TLS connection, needs the `h2` package
+HTTP2 = os.getenv("SDLC_HTTP2", "true").lower() in ("1", "true", "yes")
+# "false" disables certificate verification (self-signed endpoints), a path selects a CA bundle
+HTTP_VERIFY = os.getenv("SDLC_HTTP_VERIFY", "true")
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def http2_enabled() -> bool:
+    if HTTP2 and importlib.util.find_spec("h2") is None:
+        print("⚠️ SDLC_HTTP2 is on but the 'h2' package is missing, falling back to HTTP/1.1")
+        return False
+    return HTTP2
+
+
+def ssl_context() -> ssl.SSLContext:
+    """
+    One TLS context for every client, so the CA bundle is loaded once per process instead of
+    once per client.
+    """
+    if HTTP_VERIFY.lower() in ("0", "false", "no"):
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+    cafile = HTTP_VERIFY if os.path.exists(HTTP_VERIFY) else certifi.where()
+    return ssl.create_default_context(cafile=cafile)
+
+
+def client_settings() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "http2": _shared("http2", http2_enabled),
+        "verify": _shared("ssl_context", ssl_context),
+    }
+
+
+def _shared(name: str, factory):
+    if name not in _clients:
+        _clients[name] = factory()
+    return _clients[name]
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled HTTP client for synchronous SDKs (ChatOpenAI, LlamaStackClient)."""
+    with _lock:
+        if "sync" not in _clients:
+            _clients["sync"] = httpx.Client(**client_settings())
+            atexit.register(_clients["sync"].close)
+        return _clients["sync"]
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide pooled HTTP client for async SDK calls. Its connections belong to the event
+    loop that opened them, like the SDKs' own default clients.
+    """
+    with _lock:
+        if "async" not in _clients:
+            _clients["async"] = httpx.AsyncClient(**client_settings())
+        return _clients["async"]
+
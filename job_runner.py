@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Graph runs executing at once across every Streamlit session of the process
+JOB_WORKERS = int(os.getenv("SDLC_JOB_WORKERS", "8"))
+# Finished jobs are kept this long so a refreshed browser tab can still collect the result
+JOB_TTL_SECONDS = float(os.getenv("SDLC_JOB_TTL", "3600"))
+
+
+def artifact_hash(value) -> str:
+    """Short fingerprint of a node output field, tells which artifacts a node changed."""
+    return hashlib.sha1(str(value).encode("utf-8")).hexdigest()[:12]
+
+
+class GraphJob:
+    """Progress of one graph run, written by its worker thread and polled by the UI."""
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        self.status = "queued"  # queued, running, done or error
+        self.events = []  # {"node", "timestamp", "artifacts"} per node update, in order
+        self.active_node = ""
+        # Live LLM output of the node that is generating, reset when the next node starts streaming.
+        # Keyed by LLM run, concurrent calls of a node (parallel codegen, shards) stream side by side.
+        self.streaming_node = ""
+        self.streams = {}  # run id -> text chunks, in the order the calls started
+        self.next_nodes = ()  # nodes the thread is paused before once the job is done
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self.lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def add_tokens(self, node: str, run_id: str, text: str):
+        with self.lock:
+            if node != self.streaming_node:
+                self.streaming_node, self.streams = node, {}
+            self.streams.setdefault(run_id, []).append(text)
+
+    def add_update(self, chunk: dict):
+        """Records an "updates" stream chunk without its outputs, they are read from the checkpointer."""
+        with self.lock:
+            for node, output in chunk.items():
+                artifacts = {field: artifact_hash(value) for field, value in output.items()} if isinstance(output, dict) else {}
+                self.events.append({"node": node, "timestamp": time.time(), "artifacts": artifacts})
+                self.active_node = node
+
+    def progress(self):
+        """(node, [streamed text of each LLM call]) to display while the job runs."""
+        with self.lock:
+            return self.streaming_node or self.active_node, ["".join(chunks) for chunks in self.streams.values()]
+
+    def events_since(self, index: int):
+        with self.lock:
+            return self.events[index:]
+
+
+class JobRunner:
+    """
+    Runs graph executions on a shared worker pool, one job per graph thread. Streamlit reruns
+    only submit work and poll its progress, so they return immediately and a browser refresh
+    does not abandon a run. Threads rather than processes: the graph's checkpointer lives in
+    this process.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, ttl_seconds: float = JOB_TTL_SECONDS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="graph-job")
+        self.ttl_seconds = ttl_seconds
+        self.jobs = {}  # thread_id -> latest GraphJob
+        self.lock = threading.Lock()
+
+    def submit(self, graph, graph_input, config, on_finish=None):
+        """
+        Streams `graph_input` through the graph in the background until the next interrupt or
+        the end. `on_finish(config, graph)` runs in the worker after a successful run.
+
+        Returns:
+            (job, created): a thread that already has a running job gets that job back with
+            created=False instead of a second run.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        with self.lock:
+            self._evict_finished()
+            job = self.jobs.get(thread_id)
+            if job is not None and job.running:
+                print(f"⏳ Thread {thread_id} already has a running job")
+                return job, False
+            job = self.jobs[thread_id] = GraphJob(thread_id)
+        self.pool.submit(self._run, job, graph, graph_input, config, on_finish)
+        return job, True
+
+    def get(self, thread_id: str):
+        with self.lock:
+            return self.jobs.get(thread_id)
+
+    def _evict_finished(self):
+        now = time.time()
+        expired = [thread_id for thread_id, job in self.jobs.items()
+                   if job.finished is not None and now - job.finished > self.ttl_seconds]
+        for thread_id in expired:
+            del self.jobs[thread_id]
+
+    def _run(self, job: GraphJob, graph, graph_input, config, on_finish):
+        job.status = "running"
+        try:
+            for mode, chunk in graph.stream(graph_input, config, stream_mode=["updates", "messages"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    text = message.content if isinstance(message.content, str) else ""
+                    # Structured output (user stories, design document, reviews) streams as tool call arguments
+                    for tool_call_chunk in getattr(message, "tool_call_chunks", None) or []:
+                        text += tool_call_chunk.get("args") or ""
+                    if text:
+                        job.add_tokens(metadata.get("langgraph_node", ""), message.id or "", text)
+                else:
+                    job.add_update(chunk)
+            job.next_nodes = graph.get_state(config).next
+            if on_finish is not None:
+                on_finish(config, graph)
+            job.status = "done"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "error"
+        finally:
+            job.finished = time.time()
+
+
+job_runner = JobRunner()
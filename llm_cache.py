@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+
+# Cache tiers to enable, e.g. SDLC_LLM_CACHE=memory,disk. "off" disables response caching.
+LLM_CACHE_TIERS = os.getenv("SDLC_LLM_CACHE", "off")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("SDLC_LLM_CACHE_MAX_ENTRIES", "256"))
+LLM_CACHE_PATH = os.getenv("SDLC_LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("SDLC_LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_DISK_BYTES = int(os.getenv("SDLC_LLM_CACHE_MAX_DISK_BYTES", str(256 * 1024 * 1024)))
+
+
+def make_cache_key(model: str, prompt, inputs: dict, schema=None) -> str:
+    """
+    Content address of an LLM call: hash of model, prompt template, rendered prompt and
+    structured-output schema. Byte-identical calls map to the same key.
+    """
+    payload = {
+        "model": model,
+        "template": getattr(prompt, "template", str(prompt)),
+        "rendered": prompt.format(**inputs),
+        "schema": schema.model_json_schema() if schema is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def encode_response(response) -> dict:
+    """Converts a chain response (pydantic model or AIMessage) into a JSON-serializable payload."""
+    if hasattr(response, "model_dump") and not isinstance(response, AIMessage):
+        return {"kind": "structured", "data": response.model_dump()}
+    content = response.content if hasattr(response, "content") else response
+    return {"kind": "message", "content": content}
+
+
+def decode_response(payload: dict, schema=None):
+    """Rebuilds the chain response stored by `encode_response`."""
+    if payload["kind"] == "structured":
+        return schema.model_validate(payload["data"])
+    return AIMessage(content=payload["content"])
+
+
+class LLMCache:
+    """
+    Two-tier LLM response cache: an in-process LRU in front of an optional SQLite store.
+
+    Args:
+        max_entries (int): Capacity of the in-memory LRU tier, 0 disables it.
+        disk_path (str): SQLite file for the on-disk tier, None disables it.
+        ttl_seconds (int): Disk entries older than this are treated as misses and purged.
+        max_disk_bytes (int): Least recently used disk entries are evicted above this size.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, disk_path: Optional[str] = None,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS, max_disk_bytes: int = LLM_CACHE_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self.conn = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _remember(self, key: str, value: dict):
+        if self.max_entries <= 0:
+            return
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return self.memory[key]
+
+            if self.conn is not None:
+                now = time.time()
+                row = self.conn.execute("SELECT value, created_at FROM responses WHERE key=?", (key,)).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    self.conn.execute("UPDATE responses SET accessed_at=? WHERE key=?", (now, key))
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                    return value
+                if row:
+                    self.conn.execute("DELETE FROM responses WHERE key=?", (key,))
+                    self.stats["evictions"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: dict):
+        with self.lock:
+            self._remember(key, value)
+            if self.conn is None:
+                return
+            serialized = json.dumps(value)
+            now = time.time()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+            self._evict_disk(now)
+
+    def _evict_disk(self, now: float):
+        expired = self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        self.stats["evictions"] += max(expired, 0)
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key=?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM responses")
+
+
+def get_llm_cache(tiers: str = None) -> Optional[LLMCache]:
+    """
+    Builds the response cache selected by configuration, or None when caching is off.
+
+    Args:
+        tiers (str): Comma separated tiers ("memory", "disk"). Defaults to the SDLC_LLM_CACHE env variable.
+    """
+    tiers = {tier.strip().lower() for tier in (tiers or LLM_CACHE_TIERS).split(",") if tier.strip()}
+    if not tiers or tiers == {"off"}:
+        return None
+    unknown = tiers - {"memory", "disk"}
+    if unknown:
+        raise ValueError(f"❌ Unknown LLM cache tier(s): {sorted(unknown)}. Use 'memory', 'disk' or 'off'.")
+    return LLMCache(
+        max_entries=LLM_CACHE_MAX_ENTRIES if "memory" in tiers else 0,
+        disk_path=LLM_CACHE_PATH if "disk" in tiers else None,
+    )
@@ -0,0 +1,278 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+
+import httpx
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.config import get_config
+
+
+# Token-bucket limits of the inference endpoint, 0 disables the limit
+REQUESTS_PER_MINUTE = float(os.getenv("SDLC_LLM_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.getenv("SDLC_LLM_TOKENS_PER_MINUTE", "0"))
+# Retries of a failed call (429, 5xx, connection errors) with jittered exponential backoff
+MAX_RETRIES = int(os.getenv("SDLC_LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("SDLC_LLM_BACKOFF_BASE", "1"))
+BACKOFF_MAX_SECONDS = float(os.getenv("SDLC_LLM_BACKOFF_MAX", "60"))
+# Priority class of calls made outside a graph run or without a "priority" in the run config
+DEFAULT_PRIORITY = os.getenv("SDLC_LLM_PRIORITY", "interactive")
+
+# Lower goes first: Streamlit sessions are served ahead of batch jobs
+PRIORITIES = {"interactive": 0, "batch": 1}
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# How often a waiting call re-checks the queue when it is not first in line
+POLL_SECONDS = 0.05
+
+
+class OutputWatch(BaseCallbackHandler):
+    """Notes whether the call attempt in progress already emitted tokens."""
+
+    def __init__(self):
+        self.started = False
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.started = True
+
+
+# Watch of the call attempt in progress; inherited by every callback manager configured in this context
+_output_watch_var = ContextVar("sdlc_llm_output_watch", default=None)
+register_configure_hook(_output_watch_var, inheritable=True)
+
+
+def current_priority() -> str:
+    """Priority class from `configurable.priority` of the graph run the caller executes in."""
+    try:
+        return get_config().get("configurable", {}).get("priority", DEFAULT_PRIORITY)
+    except RuntimeError:
+        return DEFAULT_PRIORITY
+
+
+def error_status(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def retry_after_seconds(error):
+    """Delay requested by the server through Retry-After / retry-after-ms, None when absent."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error) -> bool:
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return True
+    return error_status(error) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to one minute's worth, a rate of 0 never limits."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available, 0 when they are now."""
+        if not self.rate:
+            return 0.0
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        # May go negative, e.g. when completion tokens are debited after the call
+        if self.rate:
+            self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Admission control for every LLM call of the process.
+
+    Calls wait for a request and a prompt-token budget from two token buckets, in priority
+    order (interactive before batch, then first come first served). Completion tokens are
+    debited once known. Failed calls are retried with jittered exponential backoff; a
+    Retry-After from the server pauses every caller, not only the one that got the 429/503,
+    so the endpoint is not hit by a failure storm.
+    """
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE, tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE_SECONDS,
+                 backoff_max: float = BACKOFF_MAX_SECONDS):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.waiting = []  # heap of (priority, sequence) tickets
+        self.sequence = itertools.count()
+        self.paused_until = 0.0
+
+    def limited(self) -> bool:
+        return bool(self.requests.rate or self.tokens.rate or self.paused_until > time.monotonic())
+
+    def _enqueue(self, priority: str):
+        ticket = (PRIORITIES.get(priority, 0), next(self.sequence))
+        heapq.heappush(self.waiting, ticket)
+        return ticket
+
+    def _try_acquire(self, ticket, tokens: int) -> float:
+        """Takes the slot of `ticket` and returns 0, or returns the seconds to wait. Needs the lock."""
+        if self.waiting[0] != ticket:
+            return POLL_SECONDS
+        now = time.monotonic()
+        wait = max(self.paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        heapq.heappop(self.waiting)
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.wakeup.notify_all()
+        return 0.0
+
+    def _abandon(self, ticket):
+        if ticket in self.waiting:
+            self.waiting.remove(ticket)
+            heapq.heapify(self.waiting)
+            self.wakeup.notify_all()
+
+    def acquire(self, tokens: int = 0, priority: str = None) -> float:
+        """Blocks until the call may be sent and returns the seconds it waited."""
+        if not self.limited():
+            return 0.0
+        start = time.perf_counter()
+        with self.lock:
+            ticket = self._enqueue(priority or current_priority())
+            try:
+                while (wait := self._try_acquire(ticket, tokens)) > 0:
+                    self.wakeup.wait(wait)
+            finally:
+                self._abandon(ticket)
+        return time.perf_counter() - start
+
+    async def aacquire(self, tokens: int = 0, priority: str = None) -> float:
+        if not self.limited():
+            return 0.0
+        start = time.perf_counter()
+        with self.lock:
+            ticket = self._enqueue(priority or current_priority())
+        try:
+            while True:
+                with self.lock:
+                    wait = self._try_acquire(ticket, tokens)
+                if not wait:
+                    break
+                await asyncio.sleep(min(wait, POLL_SECONDS))
+        finally:
+            with self.lock:
+                self._abandon(ticket)
+        return time.perf_counter() - start
+
+    def debit_tokens(self, tokens: int):
+        """Charges tokens only known after the call, e.g. the completion."""
+        with self.lock:
+            self.tokens.take(tokens)
+
+    def retry_delay(self, error, attempt: int, output_started: bool = False):
+        """Backoff before retry number `attempt + 1`, None when the error must be raised."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        if output_started:
+            # Tokens already reached the consumers (streaming file parser, UI), a second attempt would duplicate them
+            print(f"⚠️ LLM call failed after streaming part of its output, not retrying: {error!r}")
+            return None
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            with self.lock:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            # A little jitter so the paused callers do not all resume in the same millisecond
+            return retry_after + random.uniform(0, self.backoff_base)
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _log_retry(self, error, retries: int, delay: float):
+        status = error_status(error)
+        reason = f"HTTP {status}" if status else type(error).__name__
+        print(f"🔁 LLM call failed ({reason}), retry {retries}/{self.max_retries} in {delay:.1f}s")
+
+    def run(self, call, tokens: int = 0, priority: str = None):
+        """
+        Runs `call()` once admitted, retrying retryable errors that happen before the first
+        token was emitted.
+
+        Returns:
+            (result, queue_seconds, retries) - queue_seconds includes rate limit waits and backoff.
+        """
+        queue_seconds, retries = 0.0, 0
+        while True:
+            queue_seconds += self.acquire(tokens, priority)
+            watch = OutputWatch()
+            watch_token = _output_watch_var.set(watch)
+            try:
+                return call(), queue_seconds, retries
+            except Exception as e:
+                delay = self.retry_delay(e, retries, watch.started)
+                if delay is None:
+                    raise
+                retries += 1
+                self._log_retry(e, retries, delay)
+            finally:
+                _output_watch_var.reset(watch_token)
+            time.sleep(delay)
+            queue_seconds += delay
+
+    async def arun(self, call, tokens: int = 0, priority: str = None):
+        """Async version of `run`, `call()` returns an awaitable."""
+        queue_seconds, retries = 0.0, 0
+        while True:
+            queue_seconds += await self.aacquire(tokens, priority)
+            watch = OutputWatch()
+            watch_token = _output_watch_var.set(watch)
+            try:
+                return await call(), queue_seconds, retries
+            except Exception as e:
+                delay = self.retry_delay(e, retries, watch.started)
+                if delay is None:
+                    raise
+                retries += 1
+                self._log_retry(e, retries, delay)
+            finally:
+                _output_watch_var.reset(watch_token)
+            await asyncio.sleep(delay)
+            queue_seconds += delay
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,250 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.config import get_config
+
+
+# Port of the Prometheus text endpoint, e.g. SDLC_METRICS_PORT=9100. Unset disables the endpoint.
+METRICS_PORT = os.getenv("SDLC_METRICS_PORT")
+# Per-thread summaries kept in memory, oldest threads are dropped first
+MAX_TRACKED_THREADS = int(os.getenv("SDLC_METRICS_MAX_THREADS", "1000"))
+LATENCY_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+# Usage handler of the LLM call in progress; inherited by every callback manager configured in this context
+_usage_handler_var = ContextVar("sdlc_llm_usage_handler", default=None)
+register_configure_hook(_usage_handler_var, inheritable=True)
+
+
+def current_thread_id():
+    """thread_id of the graph run the caller executes in, empty outside of a graph run."""
+    try:
+        return get_config().get("configurable", {}).get("thread_id", "")
+    except RuntimeError:
+        return ""
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def new_thread_node_summary():
+    return {"runs": 0, "seconds": 0.0, "llm_calls": 0, "llm_seconds": 0.0, "queue_seconds": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "retries": 0, "cache_hits": 0}
+
+
+class MetricsRegistry:
+    """
+    Process-wide latency, token and cost counters for graph nodes and LLM calls.
+
+    Aggregates are exported in the Prometheus text format by `render_prometheus`, per-thread
+    summaries back the progress tracker in the Streamlit app.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.node_latency = defaultdict(Histogram)
+        self.node_errors = defaultdict(int)
+        self.llm_latency = defaultdict(Histogram)
+        self.llm_queue_seconds = defaultdict(float)
+        self.llm_calls = defaultdict(int)  # (node, "hit"/"miss") -> calls
+        self.prompt_tokens = defaultdict(int)
+        self.completion_tokens = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.discarded_speculations = defaultdict(int)
+        self.discarded_speculation_tokens = defaultdict(int)
+        self.threads = OrderedDict()
+
+    def _thread_node(self, thread_id: str, node: str):
+        if thread_id not in self.threads:
+            self.threads[thread_id] = defaultdict(new_thread_node_summary)
+            while len(self.threads) > MAX_TRACKED_THREADS:
+                self.threads.popitem(last=False)
+        self.threads.move_to_end(thread_id)
+        return self.threads[thread_id][node]
+
+    def record_node(self, node: str, thread_id: str, seconds: float, error: bool = False):
+        with self.lock:
+            self.node_latency[node].observe(seconds)
+            if error:
+                self.node_errors[node] += 1
+            summary = self._thread_node(thread_id, node)
+            summary["runs"] += 1
+            summary["seconds"] += seconds
+
+    def record_llm_call(self, node: str, thread_id: str, seconds: float, queue_seconds: float = 0.0,
+                        prompt_tokens: int = 0, completion_tokens: int = 0, retries: int = 0,
+                        cache_hit: bool = False):
+        with self.lock:
+            self.llm_calls[(node, "hit" if cache_hit else "miss")] += 1
+            self.llm_queue_seconds[node] += queue_seconds
+            self.retries[node] += retries
+            if not cache_hit:
+                self.llm_latency[node].observe(seconds)
+                self.prompt_tokens[node] += prompt_tokens
+                self.completion_tokens[node] += completion_tokens
+            summary = self._thread_node(thread_id, node)
+            summary["llm_calls"] += 1
+            summary["llm_seconds"] += seconds
+            summary["queue_seconds"] += queue_seconds
+            summary["retries"] += retries
+            summary["cache_hits"] += int(cache_hit)
+            if not cache_hit:
+                summary["prompt_tokens"] += prompt_tokens
+                summary["completion_tokens"] += completion_tokens
+
+    def record_discarded_speculation(self, node: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """An LLM call generated ahead of an Approve that was denied instead, not charged to any thread."""
+        with self.lock:
+            self.discarded_speculations[node] += 1
+            self.discarded_speculation_tokens[node] += prompt_tokens + completion_tokens
+
+    def thread_summary(self, thread_id: str) -> dict:
+        """Per-node totals for one thread, e.g. {"Generate Code": {"runs": 2, "seconds": 41.3, ...}}."""
+        with self.lock:
+            return {node: dict(values) for node, values in self.threads.get(thread_id, {}).items()}
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def histogram(name, help_text, values):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for node, hist in values.items():
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'{name}_bucket{{node="{node}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{node="{node}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{node="{node}"}} {hist.sum:.6f}')
+                lines.append(f'{name}_count{{node="{node}"}} {hist.count}')
+
+        def counter(name, help_text, values, label="node"):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in values.items():
+                if isinstance(key, tuple):
+                    lines.append(f'{name}{{node="{key[0]}",cache="{key[1]}"}} {value}')
+                else:
+                    lines.append(f'{name}{{{label}="{key}"}} {value}')
+
+        with self.lock:
+            histogram("sdlc_node_duration_seconds", "Wall time of graph node executions.", self.node_latency)
+            counter("sdlc_node_errors_total", "Graph node executions that raised.", self.node_errors)
+            histogram("sdlc_llm_duration_seconds", "Wall time of LLM calls that missed the cache.", self.llm_latency)
+            counter("sdlc_llm_calls_total", "LLM calls by cache outcome.", self.llm_calls)
+            counter("sdlc_llm_queue_seconds_total", "Time LLM calls waited for a concurrency slot.", self.llm_queue_seconds)
+            counter("sdlc_llm_prompt_tokens_total", "Prompt tokens sent to the inference endpoint.", self.prompt_tokens)
+            counter("sdlc_llm_completion_tokens_total", "Completion tokens returned by the inference endpoint.", self.completion_tokens)
+            counter("sdlc_llm_retries_total", "Retried LLM requests.", self.retries)
+            counter("sdlc_llm_speculative_discarded_total", "Speculative LLM calls whose result was discarded.", self.discarded_speculations)
+            counter("sdlc_llm_speculative_discarded_tokens_total", "Prompt and completion tokens of discarded speculative LLM calls.",
+                    self.discarded_speculation_tokens)
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class track_llm_usage:
+    """
+    Context manager collecting the token usage reported by every chat model call inside it,
+    including structured output calls whose parsed result drops the usage metadata.
+    """
+
+    def __enter__(self):
+        self.handler = UsageMetadataCallbackHandler()
+        self.token = _usage_handler_var.set(self.handler)
+        return self
+
+    def __exit__(self, *exc_info):
+        _usage_handler_var.reset(self.token)
+
+    def tokens(self):
+        """Returns (prompt_tokens, completion_tokens), (0, 0) when the endpoint reported no usage."""
+        usage = self.handler.usage_metadata.values()
+        return sum(u.get("input_tokens", 0) for u in usage), sum(u.get("output_tokens", 0) for u in usage)
+
+
+def timed_node(name: str, node):
+    """Wraps a graph node function so every execution is recorded under `name`."""
+    if asyncio.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state):
+            start, error = time.perf_counter(), False
+            try:
+                return await node(state)
+            except Exception:
+                error = True
+                raise
+            finally:
+                metrics.record_node(name, current_thread_id(), time.perf_counter() - start, error)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state):
+        start, error = time.perf_counter(), False
+        try:
+            return node(state)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.record_node(name, current_thread_id(), time.perf_counter() - start, error)
+    return wrapper
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+# Sessions of concurrent Streamlit reruns start the server at the same time, only one may bind the port
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """
+    Serves `/metrics` in the Prometheus text format from a daemon thread. Safe to call on every
+    Streamlit rerun, the server is only started once per process.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is not None or not port:
+            return _metrics_server
+        try:
+            _metrics_server = ThreadingHTTPServer(("0.0.0.0", int(port)), MetricsRequestHandler)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started on port {port}: {e}")
+            return None
+        threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+    print(f"📊 Metrics available at http://0.0.0.0:{port}/metrics")
+    return _metrics_server
@@ -8,36 +8,56 @@ from llama_stack_client.lib.agents.react.tool_parser import ReActOutput
 
 # pretty print of the results returned from the model/agent
 from termcolor import cprint
+import os
 import sys
 sys.path.append('..')  
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import uuid
-import os
 
 from dotenv import load_dotenv
 load_dotenv()
 import streamlit as st
+from http_clients import get_http_client
 
 tavily_search_api_key = os.getenv("TAVILY_SEARCH_API_KEY")
 base_url = os.getenv("REMOTE_BASE_URL")
-provider_data = {"tavily_search_api_key": tavily_search_api_key}
-client = LlamaStackClient(
-    base_url=base_url,
-    provider_data=provider_data
-)
+# The model catalog is fetched again after this many seconds, or with "Refresh models"
+MODEL_CATALOG_TTL_SECONDS = int(os.getenv("SDLC_CHAT_MODELS_TTL", "300"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_client(base_url, tavily_search_api_key):
+    """One client per endpoint for the whole process, shared by every session and rerun."""
+    return LlamaStackClient(
+        base_url=base_url,
+        provider_data={"tavily_search_api_key": tavily_search_api_key},
+        # Keep-alive connection pool shared across reruns and with the SDLC graph
+        http_client=get_http_client(),
+    )
 
 
+@st.cache_data(ttl=MODEL_CATALOG_TTL_SECONDS, show_spinner="Loading models...")
+def list_llm_models(base_url, tavily_search_api_key):
+    """Identifiers of the LLMs served by the endpoint, cached so reruns make no request."""
+    return [model.identifier for model in get_client(base_url, tavily_search_api_key).models.list() if model.model_type == "llm"]
+
+
+client = get_client(base_url, tavily_search_api_key)
 
 
 # Sidebar configurations
 with st.sidebar:
     st.header("Configuration")
-    available_models = client.models.list()
-    available_models = [model.identifier for model in available_models if model.model_type == "llm"]
+    available_models = list_llm_models(base_url, tavily_search_api_key)
     selected_model = st.selectbox(
         "Choose a model",
         available_models,
         index=0,
     )
+    # Re-fetches the model catalog, e.g. after a model was deployed
+    if st.button("Refresh models", use_container_width=True):
+        list_llm_models.clear()
+        st.rerun()
 
     temperature = float(os.getenv("TEMPERATURE"))
 
@@ -0,0 +1,165 @@
+import ast
+import os
+import re
+import threading
+from collections import defaultdict
+
+from code_parser import parse_files_from_response, render_files
+
+
+# Token budget for a rendered prompt; inputs are compacted until the prompt fits
+PROMPT_TOKEN_BUDGET = int(os.getenv("SDLC_PROMPT_TOKEN_BUDGET", "24000"))
+# Rough size of a token for Llama/GPT style tokenizers, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Prompt inputs by compaction strategy, applied in this order until the prompt fits
+FEEDBACK_INPUTS = ["feedback", "feedback_points", "qa_feedback", "security_feedback", "test_cases_review_feedback"]
+TEST_CASE_INPUTS = ["old_test_cases", "testcases"]
+CODE_INPUTS = ["previous_code", "generated_code", "code"]
+
+# Rendered prompt sizes per graph node: {node: {"calls", "last_tokens", "max_tokens", "compacted"}}
+prompt_token_counts = defaultdict(lambda: {"calls": 0, "last_tokens": 0, "max_tokens": 0, "compacted": 0})
+# Prompts are fitted concurrently by worker threads (parallel codegen, shards, graph jobs)
+prompt_token_counts_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def as_text(value) -> str:
+    return "\n".join(map(str, value)) if isinstance(value, list) else str(value or "")
+
+
+def keep_newest_feedback(value, max_chars: int):
+    """Drops the oldest feedback entries (or the start of a feedback string) to fit in max_chars."""
+    if isinstance(value, list):
+        kept, size = [], 0
+        for item in reversed(value):
+            size += len(str(item))
+            if kept and size > max_chars:
+                break
+            kept.insert(0, item)
+        if len(kept) < len(value):
+            kept.insert(0, f"[{len(value) - len(kept)} older feedback entries omitted]")
+        return kept
+    text = as_text(value)
+    if len(text) <= max_chars:
+        return text
+    return "[older feedback omitted] ..." + text[-max_chars:]
+
+
+def outline_python(code: str) -> str:
+    """Summarizes a module as its imports and class/function signatures with first docstring lines."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return "\n".join(code.splitlines()[:20]) + "\n# ... (truncated)"
+
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.get_source_segment(code, node) or "")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            lines.extend(outline_definition(code, node, indent=""))
+    lines.append("# ... (implementation omitted to fit the prompt budget)")
+    return "\n".join(lines)
+
+
+def outline_definition(code: str, node, indent: str):
+    header = (ast.get_source_segment(code, node) or "").splitlines()[0]
+    lines = [indent + header.strip()]
+    docstring = ast.get_docstring(node)
+    if docstring:
+        lines.append(f'{indent}    """{docstring.strip().splitlines()[0]}"""')
+    if isinstance(node, ast.ClassDef):
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                lines.extend(outline_definition(code, child, indent + "    "))
+    return lines
+
+
+def summarize_code(code: str, relevant_text: str) -> str:
+    """
+    Keeps files mentioned in the feedback verbatim and replaces every other file by its outline.
+    """
+    files = parse_files_from_response(code)
+    if not files:
+        return code
+    compacted = []
+    for file in files:
+        name = file["filename"]
+        if re.search(rf"\b{re.escape(name.rsplit('.', 1)[0])}\b", relevant_text):
+            compacted.append(file)
+        else:
+            compacted.append({"filename": name, "code": outline_python(file["code"])})
+    return render_files(compacted)
+
+
+def summarize_test_cases(test_cases: str) -> str:
+    """Replaces previous test cases by their names."""
+    names = re.findall(r"\[Test Case Name\]:\s*(.+)", as_text(test_cases))
+    if not names:
+        return as_text(test_cases)
+    return "Previously written test cases (details omitted):\n" + "\n".join(f"- {name.strip()}" for name in names)
+
+
+def truncate_middle(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    half = max(max_chars // 2, 1)
+    return text[:half] + "\n... [truncated to fit the prompt budget] ...\n" + text[-half:]
+
+
+def fit_prompt(prompt, inputs: dict, node: str = "", budget: int = PROMPT_TOKEN_BUDGET):
+    """
+    Measures the rendered prompt and, when it exceeds the token budget, compacts the inputs:
+    oldest feedback first, then previous test cases, then code files not mentioned in the
+    feedback, and finally a hard truncation of the largest remaining input.
+
+    Returns:
+        (inputs, tokens) - the possibly compacted inputs and the size of the rendered prompt.
+    """
+    tokens = count_tokens(prompt.format(**inputs))
+    compacted = tokens > budget
+    inputs = dict(inputs)
+
+    if tokens > budget:
+        max_chars = budget * CHARS_PER_TOKEN // 8
+        for key in FEEDBACK_INPUTS:
+            if key in inputs:
+                inputs[key] = keep_newest_feedback(inputs[key], max_chars)
+        tokens = count_tokens(prompt.format(**inputs))
+
+    if tokens > budget:
+        for key in TEST_CASE_INPUTS:
+            if key in inputs:
+                inputs[key] = summarize_test_cases(inputs[key])
+        tokens = count_tokens(prompt.format(**inputs))
+
+    if tokens > budget:
+        feedback_text = " ".join(as_text(inputs[key]) for key in FEEDBACK_INPUTS if key in inputs)
+        for key in CODE_INPUTS:
+            if key in inputs:
+                inputs[key] = summarize_code(as_text(inputs[key]), feedback_text)
+        tokens = count_tokens(prompt.format(**inputs))
+
+    template_inputs = [key for key in inputs if "{" + key + "}" in getattr(prompt, "template", "")]
+    while tokens > budget and template_inputs:
+        key = max(template_inputs, key=lambda k: len(as_text(inputs[k])))
+        text = as_text(inputs[key])
+        excess_chars = (tokens - budget) * CHARS_PER_TOKEN
+        if len(text) <= excess_chars + 200:
+            break
+        inputs[key] = truncate_middle(text, len(text) - excess_chars - 200)
+        tokens = count_tokens(prompt.format(**inputs))
+
+    with prompt_token_counts_lock:
+        counts = prompt_token_counts[node or "unknown"]
+        counts["calls"] += 1
+        counts["last_tokens"] = tokens
+        counts["max_tokens"] = max(counts["max_tokens"], tokens)
+        counts["compacted"] += int(compacted)
+    print(f"📏 {node or 'LLM call'} prompt: ~{tokens} tokens (budget {budget}{', compacted' if compacted else ''})")
+
+    return inputs, tokens
@@ -0,0 +1,142 @@
+import os
+import shutil
+import site
+import subprocess
+import sys
+import tempfile
+import time
+import venv
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
+
+# Wall time allowed for one pytest file, a hung test is reported as an error
+QA_TIMEOUT_SECONDS = int(os.getenv("SDLC_QA_TIMEOUT", "120"))
+# Test files run concurrently, each in its own pytest process
+QA_WORKERS = int(os.getenv("SDLC_QA_WORKERS", "4"))
+# Keep the working directory after the run, for debugging generated tests
+KEEP_WORKDIR = os.getenv("SDLC_QA_KEEP_WORKDIR", "false").lower() in ("1", "true", "yes")
+# Longest failure message kept per test in the QA feedback
+MAX_MESSAGE_CHARS = 500
+
+
+def pytest_available() -> bool:
+    return find_spec("pytest") is not None
+
+
+def venv_python(venv_dir: str) -> str:
+    if sys.platform == "win32":
+        return os.path.join(venv_dir, "Scripts", "python.exe")
+    return os.path.join(venv_dir, "bin", "python")
+
+
+def venv_site_packages(venv_dir: str) -> str:
+    if sys.platform == "win32":
+        return os.path.join(venv_dir, "Lib", "site-packages")
+    return os.path.join(venv_dir, "lib", f"python{sys.version_info.major}.{sys.version_info.minor}", "site-packages")
+
+
+def create_workdir(files, test_files) -> str:
+    """
+    Writes the project and its tests to a temporary directory with its own virtualenv. The
+    host's packages stay importable through a .pth file (this also works when the host itself
+    runs in a virtualenv), anything installed while testing only lands in this virtualenv.
+
+    This is not a sandbox: the generated code runs as the current user, with the user's
+    filesystem and network access.
+    """
+    workdir = tempfile.mkdtemp(prefix="sdlc-qa-")
+    for file in list(files) + list(test_files):
+        with open(os.path.join(workdir, file["filename"]), "w", encoding="utf-8") as f:
+            f.write(file["code"])
+
+    venv_dir = os.path.join(workdir, ".venv")
+    venv.create(venv_dir, with_pip=False, symlinks=sys.platform != "win32")
+    with open(os.path.join(venv_site_packages(venv_dir), "sdlc_host.pth"), "w") as f:
+        f.write("\n".join(site.getsitepackages() + [site.getusersitepackages()]) + "\n")
+    return workdir
+
+
+def runner_env(workdir: str) -> dict:
+    # Only what Python needs: no API keys or other secrets of the host process reach the tests.
+    env = {"PATH": os.environ.get("PATH", ""), "HOME": workdir, "PYTHONPATH": workdir,
+           "PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0",
+           # Host packages ship pytest plugins (e.g. langsmith) that slow down every run
+           "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"}
+    if sys.platform == "win32":
+        env["SYSTEMROOT"] = os.environ.get("SYSTEMROOT", "")
+    return env
+
+
+def parse_junit(path: str, test_file: str):
+    results = []
+    for case in ET.parse(path).getroot().iter("testcase"):
+        outcome, message = "passed", ""
+        for child in case:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[child.tag]
+                message = (child.get("message") or "").strip()
+                if not message or message == "collection failure":
+                    # The exception is on the last "E   ..." line of the traceback, e.g. an ImportError
+                    errors = [line[1:].strip() for line in (child.text or "").splitlines() if line.startswith("E ")]
+                    message = errors[-1] if errors else (child.text or message).strip()
+                break
+        results.append({"file": test_file, "name": case.get("name", ""), "outcome": outcome,
+                        "message": message[:MAX_MESSAGE_CHARS], "seconds": float(case.get("time") or 0)})
+    return results
+
+
+def run_test_file(workdir: str, test_file: str, timeout: int = QA_TIMEOUT_SECONDS):
+    """Runs one test file in its own pytest process and returns a result per test."""
+    junit_path = os.path.join(workdir, f".{test_file}.xml")
+    command = [venv_python(os.path.join(workdir, ".venv")), "-m", "pytest", "-q", "-p", "no:cacheprovider",
+               test_file, f"--junitxml={junit_path}"]
+    try:
+        process = subprocess.run(command, cwd=workdir, env=runner_env(workdir), capture_output=True,
+                                 text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return [{"file": test_file, "name": test_file, "outcome": "error",
+                 "message": f"timed out after {timeout}s", "seconds": float(timeout)}]
+
+    if os.path.exists(junit_path):
+        results = parse_junit(junit_path, test_file)
+        if results:
+            return results
+    output = (process.stdout + process.stderr).strip()
+    return [{"file": test_file, "name": test_file, "outcome": "error",
+             "message": output[-MAX_MESSAGE_CHARS:] or f"pytest exited with code {process.returncode}", "seconds": 0.0}]
+
+
+def run_tests(files, test_files, workers: int = QA_WORKERS, timeout: int = QA_TIMEOUT_SECONDS) -> dict:
+    """
+    Materializes the project in a temporary directory and runs every test file concurrently.
+
+    Returns:
+        {"results": [{"file", "name", "outcome", "message", "seconds"}], "seconds": wall time}
+    """
+    start = time.perf_counter()
+    workdir = create_workdir(files, test_files)
+    try:
+        with ThreadPoolExecutor(max_workers=max(min(workers, len(test_files)), 1)) as pool:
+            per_file = pool.map(lambda file: run_test_file(workdir, file["filename"], timeout), test_files)
+            results = [result for file_results in per_file for result in file_results]
+    finally:
+        if KEEP_WORKDIR:
+            print(f"🧪 QA working directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {"results": results, "seconds": time.perf_counter() - start}
+
+
+def summarize_results(report: dict):
+    """Returns (status, feedback): Approve only when at least one test ran and none failed."""
+    results = report["results"]
+    counts = {outcome: sum(r["outcome"] == outcome for r in results) for outcome in ("passed", "failed", "error", "skipped")}
+    status = "Approve" if counts["passed"] and not counts["failed"] and not counts["error"] else "Denied"
+    lines = [f"Local test run: {counts['passed']} passed, {counts['failed']} failed, "
+             f"{counts['error']} errors, {counts['skipped']} skipped in {report['seconds']:.1f}s."]
+    for result in results:
+        if result["outcome"] in ("failed", "error"):
+            lines.append(f"- {result['outcome'].upper()} {result['file']}::{result['name']}: {result['message']}")
+    return status, "\n".join(lines)
@@ -6,6 +6,27 @@ load_dotenv() ## aloading all the environment variable
 AUTH_TOKEN=os.getenv("LLAMA_API_KEY")
 MODEL=os.getenv("LLAMA_MODEL")
 INFERENCE_URL_BASE=os.getenv("LLAMA_URL")
+# Upper bound of in-flight requests to the inference endpoint from the async graph
+LLM_MAX_CONCURRENCY=int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Run "Security Review" and "Write Test Cases" concurrently once the code is approved
+PARALLEL_REVIEW=os.getenv("SDLC_PARALLEL_REVIEW", "false").lower() in ("1", "true", "yes")
+# On Denied reviews, ask only for the files that need to change instead of the whole codebase
+INCREMENTAL_REGENERATION=os.getenv("SDLC_INCREMENTAL_REGENERATION", "false").lower() in ("1", "true", "yes")
+# Plan the files first, then generate every file in its own concurrent call (initial generation only)
+PARALLEL_CODEGEN=os.getenv("SDLC_PARALLEL_CODEGEN", "false").lower() in ("1", "true", "yes")
+# Write test cases per group of features / API endpoints concurrently, then merge them
+SHARDED_TEST_CASES=os.getenv("SDLC_SHARDED_TEST_CASES", "false").lower() in ("1", "true", "yes")
+TEST_CASE_SHARD_SIZE=int(os.getenv("SDLC_TEST_CASE_SHARD_SIZE", "3"))
+# "pytest" runs pytest versions of the test cases against the code instead of an LLM-simulated QA.
+# The generated code runs on this host with the user's privileges, see qa_runner
+QA_MODE=os.getenv("SDLC_QA_MODE", "llm").lower()
+QA_CASES_PER_FILE=int(os.getenv("SDLC_QA_CASES_PER_FILE", "5"))
+# Compile the generated files and resolve their imports before the code review, regenerating only failing files
+CODE_VALIDATION=os.getenv("SDLC_CODE_VALIDATION", "false").lower() in ("1", "true", "yes")
+CODE_VALIDATION_ROUNDS=int(os.getenv("SDLC_CODE_VALIDATION_ROUNDS", "2"))
+# While a thread waits for a human review, generate the stage that follows an Approve in the background
+SPECULATIVE=os.getenv("SDLC_SPECULATIVE", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_WORKERS=int(os.getenv("SDLC_SPECULATIVE_WORKERS", "4"))
 
 
 # building Graph
@@ -14,23 +35,243 @@ from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 from typing import Literal
 from langchain_core.output_parsers import StrOutputParser
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableLambda
+from checkpointer import get_checkpointer
+from llm_cache import get_llm_cache, make_cache_key, encode_response, decode_response
+from code_parser import StreamingFileParser, parse_files_from_response, render_files, replace_files, is_valid_filename
+from prompt_budget import fit_prompt, count_tokens
+import qa_runner
+import static_analysis
+import code_validation
+from metrics import metrics, track_llm_usage, timed_node, current_thread_id
+from llm_scheduler import llm_scheduler
+from langgraph.config import get_config
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import uuid
+import weakref
 from pprint import pprint
 from docx import Document
 
 from langchain_openai import ChatOpenAI
-import os
+from http_clients import get_http_client, get_async_http_client
+import argparse
+import threading
+
+# Built on first use by get_llm(); assign a chat model here to swap the client (e.g. in benchmark.py)
+llm = None
+# Response cache shared by every chain, see SDLC_LLM_CACHE. Built on first use by get_response_cache()
+llm_cache = None
+_build_lock = threading.RLock()
+
+
+def get_llm():
+    """Chat model used by every chain, created once per process."""
+    global llm
+    if llm is None:
+        with _build_lock:
+            if llm is None:
+                # The 'model_name' here is often a placeholder or the deployment name
+                # and is required by the ChatOpenAI class.
+                llm = ChatOpenAI(
+                    model=MODEL,
+                    openai_api_base=INFERENCE_URL_BASE,
+                    openai_api_key=AUTH_TOKEN,
+                    # Pooled keep-alive (HTTP/2) connections shared with the chat page, see SDLC_HTTP_*.
+                    # Disable SSL verification for a self-signed or internal certificate with SDLC_HTTP_VERIFY=false
+                    http_client=get_http_client(),
+                    http_async_client=get_async_http_client(),
+                    # Retries are done by llm_scheduler, which shares Retry-After pauses across calls
+                    max_retries=0,
+                )
+    return llm
+
+
+def get_response_cache():
+    """LLM response cache, None when SDLC_LLM_CACHE is off."""
+    global llm_cache
+    if llm_cache is None:
+        with _build_lock:
+            if llm_cache is None:
+                llm_cache = get_llm_cache() or False
+    return llm_cache or None
+
+
+def current_node_name():
+    """Name of the graph node the current LLM call runs in, empty outside of a graph run."""
+    try:
+        return get_config().get("metadata", {}).get("langgraph_node", "")
+    except RuntimeError:
+        return ""
+
+
+def record_llm_call(node: str, seconds: float, queue_seconds: float, usage, prompt_tokens: int, response, retries: int = 0):
+    """
+    Records an LLM call, falling back to estimated token counts when the endpoint reports no
+    usage, and charges its completion tokens to the scheduler's tokens-per-minute budget.
+    """
+    reported_prompt_tokens, completion_tokens = usage.tokens()
+    if not completion_tokens:
+        content = response.model_dump_json() if hasattr(response, "model_dump_json") else getattr(response, "content", response)
+        completion_tokens = count_tokens(str(content))
+    llm_scheduler.debit_tokens(completion_tokens)
+    report_llm_call(node=node, seconds=seconds, queue_seconds=queue_seconds,
+                    prompt_tokens=reported_prompt_tokens or prompt_tokens, completion_tokens=completion_tokens, retries=retries)
+
+
+def report_llm_call(**call):
+    """
+    Records an LLM call for the current thread. Calls of a speculative run are only collected,
+    they are charged to the thread when a node takes the speculation (see `reuse_speculation`).
+    """
+    call["thread_id"] = current_thread_id()
+    deferred = speculation_llm_calls()
+    if deferred is not None:
+        deferred.append(call)
+    else:
+        metrics.record_llm_call(**call)
 
-# The 'model_name' here is often a placeholder or the deployment name
-# and is required by the ChatOpenAI class.
-llm = ChatOpenAI(
-    model=MODEL,
-    openai_api_base=INFERENCE_URL_BASE,
-    openai_api_key=AUTH_TOKEN
-    # Disable SSL verification if you are using a self-signed or internal certificate
-    # client_kwargs={"verify": False}
-)
+
+def reuse_response(node: str, start: float, response, schema, on_token):
+    """Returns a cached response as if it had just been generated."""
+    if on_token and schema is None:
+        on_token(response.content)
+    report_llm_call(node=node, seconds=time.perf_counter() - start, cache_hit=True)
+    return response
+
+
+def reuse_speculation(response, llm_calls, schema, on_token):
+    """Returns a speculative response as if it had just been generated, charging its LLM calls to the thread."""
+    if on_token and schema is None:
+        on_token(response.content)
+    for call in llm_calls:
+        metrics.record_llm_call(**call)
+    return response
+
+
+def merge_chunks(chunks):
+    """
+    Joins streamed message chunks in a single merge. Adding them one by one copies the content
+    received so far on every chunk, which is quadratic for long generations.
+    """
+    if len(chunks) < 2:
+        return chunks[0] if chunks else None
+    return chunks[0] + chunks[1:]
+
+
+def invoke_chain(prompt, inputs: dict, schema=None, on_token=None):
+    """
+    Runs `prompt | llm` (with structured output when a schema is given) and reuses the cached
+    response when the same model, prompt and inputs were already sent. Inputs are compacted
+    first when the rendered prompt exceeds SDLC_PROMPT_TOKEN_BUDGET.
+
+    For plain text responses, `on_token` is called with every content chunk while the
+    response streams in. Calls are admitted and retried by `llm_scheduler`, and a matching
+    speculative result (SDLC_SPECULATIVE) is reused instead of calling the model again.
+    """
+    node = current_node_name()
+    start = time.perf_counter()
+    speculative = take_speculation(prompt, inputs, schema)
+    if speculative is not None:
+        try:
+            response, llm_calls = speculative.result()
+        except Exception as e:
+            print(f"⚠️ Speculative {node} failed, generating it now: {e!r}")
+        else:
+            print(f"⚡ Reused speculative {node} result")
+            return reuse_speculation(response, llm_calls, schema, on_token)
+
+    inputs, prompt_tokens = fit_prompt(prompt, inputs, node)
+    llm_cache = get_response_cache()
+    key = make_cache_key(MODEL, prompt, inputs, schema) if llm_cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            print(f"♻️ LLM cache hit: {llm_cache.stats}")
+            return reuse_response(node, start, decode_response(cached, schema), schema, on_token)
+
+    model = get_llm()
+    chain = prompt | (model.with_structured_output(schema) if schema else model)
+
+    def call():
+        if on_token and schema is None:
+            chunks = []
+            for chunk in chain.stream(inputs):
+                on_token(chunk.content)
+                chunks.append(chunk)
+            return merge_chunks(chunks)
+        return chain.invoke(inputs)
+
+    with track_llm_usage() as usage:
+        response, queue_seconds, retries = llm_scheduler.run(call, prompt_tokens)
+    record_llm_call(node, time.perf_counter() - start, queue_seconds, usage, prompt_tokens, response, retries)
+
+    if key:
+        llm_cache.set(key, encode_response(response))
+    return response
+
+
+# One limiter per event loop, asyncio primitives cannot be shared across loops
+_llm_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_llm_semaphore():
+    loop = asyncio.get_running_loop()
+    if loop not in _llm_semaphores:
+        _llm_semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _llm_semaphores[loop]
+
+
+async def ainvoke_chain(prompt, inputs: dict, schema=None, on_token=None):
+    """
+    Async version of `invoke_chain`. At most LLM_MAX_CONCURRENCY calls per event loop are
+    in flight against the inference endpoint, the rest wait on the limiter.
+    """
+    node = current_node_name()
+    start = time.perf_counter()
+    speculative = take_speculation(prompt, inputs, schema)
+    if speculative is not None:
+        try:
+            response, llm_calls = await asyncio.wrap_future(speculative)
+        except Exception as e:
+            print(f"⚠️ Speculative {node} failed, generating it now: {e!r}")
+        else:
+            print(f"⚡ Reused speculative {node} result")
+            return reuse_speculation(response, llm_calls, schema, on_token)
+
+    inputs, prompt_tokens = fit_prompt(prompt, inputs, node)
+    llm_cache = get_response_cache()
+    key = make_cache_key(MODEL, prompt, inputs, schema) if llm_cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            print(f"♻️ LLM cache hit: {llm_cache.stats}")
+            return reuse_response(node, start, decode_response(cached, schema), schema, on_token)
+
+    model = get_llm()
+    chain = prompt | (model.with_structured_output(schema) if schema else model)
+
+    async def call():
+        if on_token and schema is None:
+            chunks = []
+            async for chunk in chain.astream(inputs):
+                on_token(chunk.content)
+                chunks.append(chunk)
+            return merge_chunks(chunks)
+        return await chain.ainvoke(inputs)
+
+    async with get_llm_semaphore():
+        semaphore_seconds = time.perf_counter() - start
+        with track_llm_usage() as usage:
+            response, queue_seconds, retries = await llm_scheduler.arun(call, prompt_tokens)
+    record_llm_call(node, time.perf_counter() - start, semaphore_seconds + queue_seconds, usage, prompt_tokens, response, retries)
+
+    if key:
+        llm_cache.set(key, encode_response(response))
+    return response
 
 
 # Data modeling
@@ -93,6 +334,14 @@ class GenerateCode(BaseModel):
         description="Generated code in the format mentioned in the prompt."
     )
 
+class PlannedFile(BaseModel):
+    filename: str = Field(description="File name in snake_case.py")
+    responsibility: str = Field(description="What this file is responsible for")
+    interface: str = Field(description="Public classes, functions and constants of the file with their signatures")
+
+class CodePlan(BaseModel):
+    files: List[PlannedFile] = Field(description="Every file of the project, entry point last")
+
 class TestCases(BaseModel):
     cases: str
 
@@ -131,11 +380,10 @@ def save_user_stories_to_txt(state: dict, output_dir="artifacts", filename="user
     print(f"✅ User stories saved to: {output_path}")
 
 
-def auto_generate_user_stories(state:State):
-    # feedback_points = state.get('user_story_feedback', "")
-
-    if state["requirements"] == "":
-        return {"error": "Please enter requirement before generating user stories!!"}
+def user_stories_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call that generates user stories."""
+    # The reviewer's feedback is part of the prompt, so a regeneration after Denied misses the cache
+    feedback_points = join_feedback(state.get('user_story_feedback'))
 
     prompt_user_stories = PromptTemplate(
 
@@ -164,8 +412,10 @@ def auto_generate_user_stories(state:State):
         input_variables=["requirements"]
     )
     
-    chain_userstory = prompt_user_stories | llm.with_structured_output(UserStories)
-    response = chain_userstory.invoke({'requirements': state['requirements'], 'feedback_points': state.get('feedback_points', "")})
+    return prompt_user_stories, {'requirements': state['requirements'], 'feedback_points': feedback_points}, UserStories
+
+
+def store_user_stories(state: State, response):
     state['user_stories'] = response.stories
 
     save_user_stories_to_txt(state, filename="user_stories.txt")
@@ -173,6 +423,20 @@ def auto_generate_user_stories(state:State):
     return state
 
 
+def auto_generate_user_stories(state:State):
+    if state["requirements"] == "":
+        return {"error": "Please enter requirement before generating user stories!!"}
+
+    return store_user_stories(state, invoke_chain(*user_stories_prompt(state)))
+
+
+async def auto_generate_user_stories_async(state:State):
+    if state["requirements"] == "":
+        return {"error": "Please enter requirement before generating user stories!!"}
+
+    return store_user_stories(state, await ainvoke_chain(*user_stories_prompt(state)))
+
+
 def human_user_story_approval(state: State):
     # No operation – this is just a HITL pause node
     return state
@@ -238,8 +502,8 @@ def save_design_document_to_word(state: dict, output_dir="artifacts", filename="
     print(f"✅ Design document saved to: {filepath}")
 
 
-def create_design_document(state: State):
-
+def design_document_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call that creates the design document."""
     prompt_create_design_document = PromptTemplate(
         template="""
         You are a senior software architect responsible for producing **detailed, production-grade design documents** based on a set of user stories, and optionally, prior review feedback.
@@ -330,12 +594,13 @@ def create_design_document(state: State):
         input_variables=["user_stories", "feedback"]
     )
 
-    chain_create_design_document = prompt_create_design_document | llm.with_structured_output(DesignDocument)
-    response = chain_create_design_document.invoke(
-                            { "user_stories": "\n".join(state['user_stories']), 
-                              "feedback": state.get("design_document_review_feedback", "")
-                             })
-    
+    return (prompt_create_design_document,
+            { "user_stories": "\n".join(state['user_stories']), 
+              "feedback": state.get("design_document_review_feedback", "")
+             }, DesignDocument)
+
+
+def store_design_document(state: State, response):
     state['design_document'] = {
                                 'functional': response.functional,
                                 'technical': response.technical,
@@ -348,6 +613,14 @@ def create_design_document(state: State):
     return state
 
 
+def create_design_document(state: State):
+    return store_design_document(state, invoke_chain(*design_document_prompt(state)))
+
+
+async def create_design_document_async(state: State):
+    return store_design_document(state, await ainvoke_chain(*design_document_prompt(state)))
+
+
 def save_files(file_blocks, output_dir="generated_code"):
     """
     Save parsed code blocks to files in specified directory.
@@ -365,77 +638,81 @@ def save_files(file_blocks, output_dir="generated_code"):
         print(f"✅ Saved: {filename}")
 
 
-def parse_files_from_response(response_text: str):
+def join_feedback(feedback):
+    return '\n'.join(feedback) if isinstance(feedback, list) else str(feedback or '')
+
+
+def incremental_regeneration_feedback(state: State):
     """
-    Parses code blocks from LLM output that includes:
-    Filename: <file>
-    Code:
-    ```python
-    <code>
-    ```
+    Returns the review feedback to address when this round is an incremental regeneration
+    (SDLC_INCREMENTAL_REGENERATION and a Denied review), otherwise None.
     """
-    pattern = r"Filename:\s*(?P<filename>[\w_]+\.py)\s*Code:\s*```(?:python)?\s*(?P<code>.*?)```"
-    matches = re.finditer(pattern, response_text, re.DOTALL)
+    if not INCREMENTAL_REGENERATION or not parse_files_from_response(str(state.get('code', ''))):
+        return None
+    if state.get('code_review_status') == "Denied":
+        return "Code Review Feedback:\n" + join_feedback(state.get('code_review_feedback'))
+    if state.get('security_review_status') == "Denied" and state.get('code_review_status') == "Approve":
+        return "Security Review Feedback:\n" + join_feedback(state.get('security_review_feedback'))
+    if state.get('security_review_status') == "Approve" and state.get('code_review_status') == "Approve" and state.get('qa_review_status') == "Denied":
+        return ("QA Review Feedback:\n" + join_feedback(state.get('qa_review_feedback'))
+                + "\n\nSecurity Review Feedback:\n" + join_feedback(state.get('security_review_feedback')))
+    return None
+
+
+def incremental_code_prompt(state: State, feedback: str):
+    """Builds the call that asks only for the files that must change to address the feedback."""
+    prompt_incremental_code = PromptTemplate(
+        template = 
+        """
+        You are a senior software engineer fixing an existing Python codebase after a review.
+
+        ---
 
-    files = []
-    for match in matches:
-        files.append({
-            "filename": match.group("filename").strip(),
-            "code": match.group("code").strip()
-        })
+        ### Context:
+        - Below is the latest **Design Document** the code implements:
+        {design_document}
 
-    # Fallback in case of single unnamed code block
-    if not files:
-        fallback = re.search(r"```(?:python)?\s*(.*?)```", response_text, re.DOTALL)
-        if fallback:
-            files.append({
-                "filename": "main.py",
-                "code": fallback.group(1).strip()
-            })
+        - The following **Review Feedback** was provided:
+        {feedback}
 
-    return files
+        - Below is the **current version of the code**, one block per file:
+        {previous_code}
 
+        ---
 
-def parse_files_from_response(response_text: str):
-    """
-    Parses code blocks from LLM-generated response containing multiple Python files
-    formatted with 'Filename:' and 'Code:' markers.
+        ### Your Task:
+        Address all of the feedback with the smallest set of file changes.
+        Output ONLY the files that must be created or changed. Files you do not output are kept as they are.
 
-    Returns:
-        List[Dict] - Each dict contains 'filename' and 'code' keys.
-    """
-    # Matches well-formed file blocks like:
-    # Filename: user_interface.py
-    # Code:
-    # ```python
-    # <code>
-    # ```
-    pattern = r"Filename:\s*(?P<filename>[\w_]+\.py)\s*Code:\s*```(?:python)?\s*(?P<code>.*?)```"
-    matches = list(re.finditer(pattern, response_text, re.DOTALL))
-
-    files = []
-    if matches:
-        for match in matches:
-            files.append({
-                "filename": match.group("filename").strip(),
-                "code": match.group("code").strip()
-            })
-    else:
-        # Fallback if only one large unnamed code block exists
-        fallback_match = re.search(r"```(?:python)?\s*(.*?)```", response_text, re.DOTALL)
-        if fallback_match:
-            files.append({
-                "filename": "main.py",  # default fallback
-                "code": fallback_match.group(1).strip()
-            })
-        else:
-            print("❌ No code blocks found in response.")
-    
-    return files
+        ### Rules to Follow Strictly:
+        1. For **each changed or new file**, include:
+        - A `Filename:` line specifying the file name (in `snake_case.py`)
+        - A `Code:` block with the **complete** new content of that file in a fenced markdown block like:
+            ```
+            Filename: user_interface.py
+            Code:
+            ```python
+            <full python code>
+            ```
+        2. DO NOT output unchanged files.
+        3. DO NOT output partial files or diffs — every output file replaces the old file entirely.
+        4. DO NOT include any explanations, introductions, or summaries.
+        """,
+        input_variables=["design_document", "feedback", "previous_code"]
+    )
+    return prompt_incremental_code, {
+        "design_document": state['design_document'],
+        "feedback": feedback,
+        "previous_code": str(state.get('code', '')),
+    }, None
 
 
-def generate_code(state: State):
-    
+def code_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call for the current code generation or regeneration round."""
+    feedback = incremental_regeneration_feedback(state)
+    if feedback is not None:
+        return incremental_code_prompt(state, feedback)
+
     if state.get('code_review_status') == "Denied":
         prompt_regenerate_code = PromptTemplate(
             template = 
@@ -518,12 +795,11 @@ def generate_code(state: State):
                 input_variables=["design_document", "feedback", "previous_code"]
             )
 
-        chain_code_regeneration = prompt_regenerate_code | llm.with_structured_output(GenerateCode)
-        code_response = chain_code_regeneration.invoke(
+        return (prompt_regenerate_code,
             {"design_document":state['design_document'],
              "feedback":state['code_review_feedback'],
              "previous_code":state['code'],
-             })
+             }, GenerateCode)
     elif state.get('security_review_status') == "Denied" and state.get('code_review_status') == "Approve":
         prompt_regenerate_code = PromptTemplate(
             template = 
@@ -610,15 +886,14 @@ def generate_code(state: State):
             Maintain proper Python indentation and formatting.
             Assume the generated files will be saved separately in a project folder.
             """,
-                input_variables=["design_document", "feedback", "previous_code"]
+                input_variables=["design_document", "security_feedback", "previous_code"]
             )
 
-        chain_code_regeneration = prompt_regenerate_code | llm.with_structured_output(GenerateCode)
-        code_response = chain_code_regeneration.invoke(
+        return (prompt_regenerate_code,
             {"design_document":state['design_document'],
-             "feedback":state['security_review_feedback'],
+             "security_feedback":state['security_review_feedback'],
              "previous_code":state['code'],
-             })
+             }, GenerateCode)
     elif state.get('security_review_status') == "Approve" and state.get('code_review_status') == "Approve" and state.get('qa_review_status') == "Denied":
         prompt_regenerate_code = PromptTemplate(
             template = 
@@ -711,7 +986,6 @@ def generate_code(state: State):
                 input_variables=["design_document", "qa_feedback", "security_feedback", "previous_code"]
             )
 
-        chain_code_regeneration = prompt_regenerate_code | llm
         # Prepare input with proper handling of optional fields
         input_data = {
             "design_document": state['design_document'],
@@ -719,8 +993,7 @@ def generate_code(state: State):
             "security_feedback": '\n'.join(state.get('security_review_feedback', [])) if isinstance(state.get('security_review_feedback'), list) else str(state.get('security_review_feedback', '')),
             "previous_code": str(state.get('code', ''))
         }
-        code_response = chain_code_regeneration.invoke(input_data)
-        code_response = code_response.content if hasattr(code_response, 'content') else code_response
+        return prompt_regenerate_code, input_data, None
         
     else:
         prompt_generate_code = PromptTemplate(
@@ -788,20 +1061,30 @@ def generate_code(state: State):
             )
         # chain_code_generation = prompt_generate_code | llm.with_structured_output(GenerateCode)
         # code_response = chain_code_generation.invoke({"design_document":state['design_document']})
-        chain_code_generation = prompt_generate_code | llm
-        code_response = chain_code_generation.invoke({"design_document": state['design_document']})
-    
+        return prompt_generate_code, {"design_document": state['design_document']}, None
+
+
+def store_code(state: State, code_response, streamed_files=None):
     generated_code = code_response.content if hasattr(code_response, "content") else code_response
+    # Structured GenerateCode responses from the regeneration prompts
+    generated_code = getattr(generated_code, "generated_code", generated_code)
 
 
     print("==> code_response: ", generated_code)
 
+    if incremental_regeneration_feedback(state) is not None:
+        return merge_changed_files(state, generated_code)
+
     try:
-        # Parse the code blocks from the response
-        file_blocks = parse_files_from_response(generated_code)
+        if streamed_files is not None:
+            # Files were parsed and saved while the response streamed in
+            file_blocks = streamed_files.close()
+        else:
+            # Parse the code blocks from the response
+            file_blocks = parse_files_from_response(generated_code)
 
-        # Save the files
-        save_files(file_blocks)
+            # Save the files
+            save_files(file_blocks)
 
         # Save the generated code to state
         state['code'] = generated_code
@@ -813,6 +1096,336 @@ def generate_code(state: State):
     return state
 
 
+def merge_changed_files(state: State, generated_code: str):
+    """
+    Applies an incremental regeneration response: changed files replace their previous version,
+    new files are added, and only files whose content actually changed are rewritten on disk.
+    Every other block of the previous code, e.g. requirements.txt, is kept.
+    """
+    files = {file["filename"]: file["code"] for file in parse_files_from_response(str(state.get('code', '')))}
+    changed_files = [
+        file for file in parse_files_from_response(generated_code)
+        if files.get(file["filename"]) != file["code"]
+    ]
+    if not changed_files:
+        print("⚠️ Incremental regeneration returned no changed files.")
+        return state
+
+    for file in changed_files:
+        files[file["filename"]] = file["code"]
+    save_files(changed_files)
+    print(f"✅ Updated {len(changed_files)} of {len(files)} files: {[file['filename'] for file in changed_files]}")
+
+    state['code'] = replace_files(str(state.get('code', '')), changed_files)
+    return state
+
+
+def code_stream_parser(state: State, schema):
+    """
+    Parser that saves each file as soon as its block is complete, so file persistence overlaps
+    generation. Only used for full plain-text generations, incremental rounds merge files afterwards.
+    """
+    if schema is not None or incremental_regeneration_feedback(state) is not None:
+        return None
+    return StreamingFileParser(on_file=lambda file: save_files([file]))
+
+
+def generate_code(state: State):
+    if uses_parallel_codegen(state):
+        return generate_code_parallel(state)
+    prompt, inputs, schema = code_prompt(state)
+    parser = code_stream_parser(state, schema)
+    response = invoke_chain(prompt, inputs, schema, on_token=parser.feed if parser else None)
+    return store_code(state, response, parser)
+
+
+async def generate_code_async(state: State):
+    if uses_parallel_codegen(state):
+        return await generate_code_parallel_async(state)
+    prompt, inputs, schema = code_prompt(state)
+    parser = code_stream_parser(state, schema)
+    response = await ainvoke_chain(prompt, inputs, schema, on_token=parser.feed if parser else None)
+    return store_code(state, response, parser)
+
+
+def uses_parallel_codegen(state: State) -> bool:
+    """SDLC_PARALLEL_CODEGEN applies to the initial generation, review rounds regenerate as before."""
+    if not PARALLEL_CODEGEN or incremental_regeneration_feedback(state) is not None:
+        return False
+    code_status, security_status = state.get('code_review_status'), state.get('security_review_status')
+    return not (code_status == "Denied"
+                or (security_status == "Denied" and code_status == "Approve")
+                or (security_status == "Approve" and code_status == "Approve" and state.get('qa_review_status') == "Denied"))
+
+
+def code_plan_prompt(state: State):
+    """Builds the (prompt, inputs, schema) planning call: the file list and each file's interface."""
+    prompt_plan_code = PromptTemplate(
+        template =
+        """
+        You are a senior software architect planning a modular, production-grade Python project
+        based **only** on the following design document:
+
+        {design_document}
+
+        ---
+
+        List every Python file of the project. Use **one file per logical component**, such as
+        `api.py` for route handling, `models.py` for data models, `services.py` for business logic,
+        `config.py` for environment setup and `main.py` or `app.py` as the entry point.
+
+        For each file give:
+        - filename: the file name in snake_case.py
+        - responsibility: one or two sentences on what the file does
+        - interface: the public classes, functions and constants other files may import, with
+          full signatures and the module they are imported from
+
+        The interfaces must be consistent with each other: every import a file needs from another
+        file must appear in that file's interface. Do not write any implementation.
+        """,
+        input_variables=["design_document"]
+    )
+    return prompt_plan_code, {"design_document": state['design_document']}, CodePlan
+
+
+def generate_code_prompt(state: State):
+    """First LLM call of "Generate Code": the planning call in parallel mode, the whole code otherwise."""
+    return code_plan_prompt(state) if uses_parallel_codegen(state) else code_prompt(state)
+
+
+def render_code_plan(plan: CodePlan) -> str:
+    return "\n\n".join(
+        f"{file.filename}\nResponsibility: {file.responsibility}\nInterface:\n{file.interface}"
+        for file in plan.files
+    )
+
+
+def file_code_prompt(state: State, plan: CodePlan, planned_file: PlannedFile):
+    """Builds the call that writes one planned file against the interfaces of all the others."""
+    prompt_file_code = PromptTemplate(
+        template =
+        """
+        You are a senior software engineer implementing one file of a modular, production-grade Python project.
+
+        Design document:
+        {design_document}
+
+        ---
+
+        Project plan, every file with the interface the other files rely on:
+        {plan}
+
+        ---
+
+        Write the complete code of `{filename}` only.
+        Responsibility: {responsibility}
+        It must provide exactly this interface, importing what it needs from the other planned files:
+        {interface}
+
+        ### Coding Guidelines:
+        - Follow the **Single Responsibility Principle**
+        - Include complete imports and logic
+        - Add docstrings for each function and class
+        - Avoid unnecessary libraries
+        - Include exception handling where needed
+
+        ### Output Format (strictly follow this):
+        Filename: {filename}
+        Code:
+        ```python
+        <Full Python code for this file>
+        ```
+
+        DO NOT include any explanations or any other file.
+        """,
+        input_variables=["design_document", "plan", "filename", "responsibility", "interface"]
+    )
+    return (prompt_file_code,
+            {"design_document": state['design_document'],
+             "plan": render_code_plan(plan),
+             "filename": planned_file.filename,
+             "responsibility": planned_file.responsibility,
+             "interface": planned_file.interface},
+            None)
+
+
+def planned_file_block(response, filename: str):
+    """The block of `filename` in a per-file response; a single block under another name is renamed."""
+    file_blocks = parse_files_from_response(getattr(response, "content", str(response)))
+    for file in file_blocks:
+        if file["filename"] == filename:
+            return file
+    if file_blocks:
+        return {"filename": filename, "code": file_blocks[0]["code"]}
+    print(f"❌ No code returned for {filename}")
+    return None
+
+
+def store_parallel_code(state: State, plan: CodePlan, file_blocks):
+    """Assembles the files in plan order into `state['code']`."""
+    by_name = {file["filename"]: file for file in file_blocks if file}
+    ordered = [by_name[file.filename] for file in plan.files if file.filename in by_name]
+    print(f"✅ Generated {len(ordered)} of {len(plan.files)} planned files in parallel")
+    state['code'] = render_files(ordered)
+    return state
+
+
+def checked_code_plan(plan: CodePlan) -> CodePlan:
+    """
+    Keeps the planned files whose names the code parser accepts. Model-chosen paths are reduced to
+    their basename (`app/main.py`, `../main.py` -> `main.py`) so nothing is written outside the
+    output directory; other files (`requirements.txt`) and duplicates are dropped.
+    """
+    files, seen = [], set()
+    for planned_file in plan.files:
+        filename = os.path.basename(planned_file.filename.strip().replace("\\", "/"))
+        if not is_valid_filename(filename) or filename in seen:
+            print(f"⚠️ Dropping planned file {planned_file.filename!r}")
+            continue
+        seen.add(filename)
+        files.append(planned_file.model_copy(update={"filename": filename}))
+    return CodePlan(files=files)
+
+
+def generate_code_parallel(state: State):
+    """Two-phase generation: plan the files, then write every file concurrently."""
+    plan = checked_code_plan(invoke_chain(*code_plan_prompt(state)))
+    if not plan.files:
+        print("⚠️ No valid planned files, generating the code in a single call")
+        prompt, inputs, schema = code_prompt(state)
+        parser = code_stream_parser(state, schema)
+        return store_code(state, invoke_chain(prompt, inputs, schema, on_token=parser.feed if parser else None), parser)
+
+    def write_file(planned_file):
+        block = planned_file_block(invoke_chain(*file_code_prompt(state, plan, planned_file)), planned_file.filename)
+        if block:
+            save_files([block])
+        return block
+
+    # Each call runs in a copy of this node's context, so metrics and the scheduler see the node
+    with ThreadPoolExecutor(max_workers=min(len(plan.files), LLM_MAX_CONCURRENCY)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, write_file, planned_file) for planned_file in plan.files]
+        file_blocks = [future.result() for future in futures]
+    return store_parallel_code(state, plan, file_blocks)
+
+
+async def generate_code_parallel_async(state: State):
+    plan = checked_code_plan(await ainvoke_chain(*code_plan_prompt(state)))
+    if not plan.files:
+        print("⚠️ No valid planned files, generating the code in a single call")
+        prompt, inputs, schema = code_prompt(state)
+        parser = code_stream_parser(state, schema)
+        return store_code(state, await ainvoke_chain(prompt, inputs, schema, on_token=parser.feed if parser else None), parser)
+
+    async def write_file(planned_file):
+        block = planned_file_block(await ainvoke_chain(*file_code_prompt(state, plan, planned_file)), planned_file.filename)
+        if block:
+            save_files([block])
+        return block
+
+    file_blocks = await asyncio.gather(*(write_file(planned_file) for planned_file in plan.files))
+    return store_parallel_code(state, plan, file_blocks)
+
+
+def file_fix_prompt(state: State, file: dict, problems, files):
+    """Builds the call that rewrites one generated file to fix the problems local validation found."""
+    prompt_fix_file = PromptTemplate(
+        template =
+        """
+        You are a senior software engineer fixing one file of a generated Python project.
+
+        ### Problems found by compiling the file and resolving its imports:
+        {problems}
+
+        ### Other modules of the project and the names they define:
+        {interfaces}
+
+        ### Current content of `{filename}`:
+        ```python
+        {code}
+        ```
+
+        ### Your Task:
+        Fix every problem above with the smallest change. Import only from the standard library,
+        the modules listed above, or packages the file already depends on.
+        Output the complete fixed file and nothing else, formatted as:
+            Filename: {filename}
+            Code:
+            ```python
+            <full python code>
+            ```
+        """,
+        input_variables=["problems", "interfaces", "filename", "code"]
+    )
+    return prompt_fix_file, {
+        "problems": "\n".join(f"- {problem}" for problem in problems),
+        "interfaces": code_validation.module_interfaces([other for other in files if other["filename"] != file["filename"]]),
+        "filename": file["filename"],
+        "code": file["code"],
+    }, None
+
+
+def failing_files(state: State, round_number: int, packages=None):
+    """
+    (files, {filename: problems}) of the current code. Returns no problems when they are fixed,
+    validation is off, or the last round was reached (the remaining problems are then reported).
+    """
+    files = parse_files_from_response(str(state.get('code', '')))
+    if not CODE_VALIDATION or not files:
+        return files, {}
+    issues = code_validation.validate_files(files, packages)
+    if not issues:
+        print(f"✅ Validated {len(files)} generated files")
+    elif round_number >= CODE_VALIDATION_ROUNDS:
+        print(f"⚠️ {len(issues)} file(s) still fail validation, leaving them to the code review: {issues}")
+        return files, {}
+    else:
+        print(f"🔧 Regenerating {len(issues)} file(s) that fail validation: {issues}")
+    return files, issues
+
+
+def store_fixed_files(state: State, fixed_blocks):
+    """Replaces the fixed files in `state['code']`, keeping its other blocks such as requirements.txt."""
+    fixed = [block for block in fixed_blocks if block]
+    save_files(fixed)
+    state['code'] = replace_files(str(state.get('code', '')), fixed)
+
+
+def validate_code(state: State):
+    """Compiles the generated files and resolves their imports, regenerating only the files that fail."""
+    packages = code_validation.declared_packages(state.get('code', ''))
+    for round_number in range(CODE_VALIDATION_ROUNDS + 1):
+        files, issues = failing_files(state, round_number, packages)
+        if not issues:
+            break
+
+        def fix_file(file):
+            return planned_file_block(invoke_chain(*file_fix_prompt(state, file, issues[file["filename"]], files)), file["filename"])
+
+        # Each call runs in a copy of this node's context, so metrics and the scheduler see the node
+        broken = [file for file in files if file["filename"] in issues]
+        with ThreadPoolExecutor(max_workers=min(len(broken), LLM_MAX_CONCURRENCY)) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, fix_file, file) for file in broken]
+            store_fixed_files(state, [future.result() for future in futures])
+    return {'code': state.get('code', '')}
+
+
+async def validate_code_async(state: State):
+    packages = code_validation.declared_packages(state.get('code', ''))
+    for round_number in range(CODE_VALIDATION_ROUNDS + 1):
+        files, issues = failing_files(state, round_number, packages)
+        if not issues:
+            break
+
+        async def fix_file(file):
+            response = await ainvoke_chain(*file_fix_prompt(state, file, issues[file["filename"]], files))
+            return planned_file_block(response, file["filename"])
+
+        broken = [file for file in files if file["filename"] in issues]
+        store_fixed_files(state, await asyncio.gather(*(fix_file(file) for file in broken)))
+    return {'code': state.get('code', '')}
+
+
 def human_code_review(state: State):
     # No operation – this is just a HITL pause node
     return state
@@ -822,8 +1435,24 @@ def code_review_human_decision(state:State) -> Literal['Approve', 'Denied']:
     return state.get("code_review_status", "Approve")
 
 
-def security_review(state: State):
-    """Conducts a security review of the code to check for vulnerabilities."""
+def security_review_gate(state: State):
+    """
+    Denied Review of the local static analysis when the code has blocking findings (hardcoded
+    secrets, debug mode, SQL built from strings, missing imports), None when the LLM should review.
+    """
+    findings = static_analysis.blocking_findings(state['code'])
+    if not findings:
+        return None
+    print(f"🚫 Static analysis found {len(findings)} blocking issue(s), skipping the LLM security review")
+    return Review(
+        status="Denied",
+        review="The static analysis found these issues, fix them before the security review:\n"
+               + static_analysis.format_findings(findings),
+    )
+
+
+def security_review_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call for the security review."""
     prompt_security = PromptTemplate(
         template="""You are a senior cybersecurity expert specializing in secure coding practices and vulnerability assessment.
 
@@ -832,24 +1461,51 @@ def security_review(state: State):
         **Code:**
         {generated_code}
 
+        **Static analysis:**
+        {static_findings}
+
+        Verify the static analysis findings and look for the issues it cannot detect.
         Provide structured feedback, including detected issues and suggested fixes.
         Format:
         - Status: Approve / Denied
         - Feedback: (Explain security risks and provide recommended changes)
         
         """,
-        input_variables=["generated_code"]
+        input_variables=["generated_code", "static_findings"]
         )
     
-    chain_security = prompt_security | llm.with_structured_output(Review)
-    response_security = chain_security.invoke({
-        "generated_code": state['code']
-    })
+    findings = static_analysis.analyze_code(str(state['code'])) if static_analysis.STATIC_ANALYSIS != "off" else ()
+    return prompt_security, {
+        "generated_code": state['code'],
+        "static_findings": static_analysis.summarize_findings(findings),
+    }, Review
+
 
+def security_review_calls(state: State):
+    """The LLM security review call, none when the static analysis gate denies the code."""
+    return [] if security_review_gate(state) else [security_review_prompt(state)]
+
+
+def store_security_review(state: State, response_security):
     state['security_review_status'] = response_security.status
     state['security_review_feedback'] = response_security.review
 
-    return state
+    # Only the fields owned by this node, so it can run in parallel with "Write Test Cases"
+    return {
+        'security_review_status': state['security_review_status'],
+        'security_review_feedback': state['security_review_feedback'],
+    }
+
+
+def security_review(state: State):
+    """Conducts a security review of the code to check for vulnerabilities."""
+    gated = security_review_gate(state)
+    return store_security_review(state, gated or invoke_chain(*security_review_prompt(state)))
+
+
+async def security_review_async(state: State):
+    gated = security_review_gate(state)
+    return store_security_review(state, gated or await ainvoke_chain(*security_review_prompt(state)))
 
 def human_security_review(state: State):
     # No operation – this is just a HITL pause node
@@ -890,8 +1546,8 @@ def save_test_cases_to_files(response_text, output_dir="test_cases"):
             print(f"✅ Saved: {filepath}")
 
 
-def write_test_cases(state:State):
-    """Generates test cases for the code based on functional and technical design documents."""
+def test_cases_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call that writes or rewrites the test cases."""
     
     # Validate required state
     if "code" not in state or not state["code"]:
@@ -989,14 +1645,13 @@ def write_test_cases(state:State):
             input_variables=["generated_code", "test_cases_review_feedback", "design_document", "old_test_cases"]
         )
 
-        chain_test_case_rewrite = prompt_test_case_rewrite | llm
-        test_cases = chain_test_case_rewrite.invoke({
+        return prompt_test_case_rewrite, {
             "generated_code": state["code"],
             "design_document": state["design_document"],
             "old_test_cases": state["test_cases"],
             "test_cases_review_feedback": state["test_cases_review_feedback"],
             
-        })
+        }, None
     else:
         prompt_test_case = PromptTemplate(
             template="""You are a senior QA engineer responsible for writing high-quality test cases for Python systems.
@@ -1081,12 +1736,13 @@ def write_test_cases(state:State):
             input_variables=["generated_code", "design_document"]
         )
 
-        chain_test_case = prompt_test_case | llm
-        test_cases = chain_test_case.invoke({
+        return prompt_test_case, {
             "generated_code": state["code"],
             "design_document": state["design_document"]
-        })
+        }, None
+
 
+def store_test_cases(state: State, test_cases):
     # Extract test cases content if it's an AIMessage
     raw_test_cases = getattr(test_cases, "content", test_cases)
     if isinstance(raw_test_cases, dict) and "text" in raw_test_cases:
@@ -1103,7 +1759,104 @@ def write_test_cases(state:State):
     state["test_cases"] = raw_test_cases
     print("✅ Test cases stored in state:", state["test_cases"][:100], "...")
     
-    return state
+    # Only the field owned by this node, so it can run in parallel with "Security Review"
+    return {"test_cases": state["test_cases"]}
+
+
+ENDPOINT_PATTERN = re.compile(r"\b(GET|POST|PUT|PATCH|DELETE)\s+(/[\w/{}<>:.\-]*)")
+
+
+def test_case_shards(state: State):
+    """
+    Splits the design document into groups of TEST_CASE_SHARD_SIZE features: every functional
+    requirement, plus the API endpoints of the technical design no functional requirement mentions.
+    """
+    design_document = state.get("design_document") or {}
+    features = [str(item) for item in design_document.get("functional", []) if str(item).strip()]
+    mentioned = " ".join(features)
+    for method, path in ENDPOINT_PATTERN.findall("\n".join(map(str, design_document.get("technical", [])))):
+        endpoint = f"{method} {path}"
+        if path not in mentioned and f"Endpoint: {endpoint}" not in features:
+            features.append(f"Endpoint: {endpoint}")
+    size = max(TEST_CASE_SHARD_SIZE, 1)
+    return [features[i:i + size] for i in range(0, len(features), size)]
+
+
+def test_cases_calls(state: State):
+    """
+    (prompt, inputs, schema) of every call writing the test cases: one per shard with
+    SDLC_SHARDED_TEST_CASES on a first write, a single call otherwise.
+    """
+    prompt, inputs, schema = test_cases_prompt(state)
+    shards = test_case_shards(state) if SHARDED_TEST_CASES and state.get("test_cases_review_status") != "Denied" else []
+    if len(shards) < 2:
+        return [(prompt, inputs, schema)]
+
+    prompt_test_case_shard = PromptTemplate(
+        template=prompt.template + """
+
+            ---
+            ### Scope of this request:
+            Write test cases ONLY for the following features / endpoints, other parts of the system are covered separately:
+            {scope}
+            """,
+        input_variables=list(prompt.input_variables) + ["scope"]
+    )
+    return [(prompt_test_case_shard, {**inputs, "scope": "\n".join(f"- {feature}" for feature in shard)}, schema)
+            for shard in shards]
+
+
+def split_test_cases(text):
+    """Returns (name, test case block) for every named test case of a test case response."""
+    cases = []
+    for case in re.split(r"\n---\n", str(getattr(text, "content", text)).strip()):
+        name_match = re.search(r"\[Test Case Name\]:\s*(.+)", case)
+        if name_match:
+            cases.append((name_match.group(1).strip(), case.strip()))
+    return cases
+
+
+def merge_test_cases(responses):
+    """
+    Joins the test cases of every shard, keeping the first test case of each name. A shard
+    without any `[Test Case Name]` header is kept as it is instead of being dropped.
+    """
+    merged, seen = [], set()
+    for response in responses:
+        cases = split_test_cases(response)
+        if not cases:
+            text = str(getattr(response, "content", response)).strip()
+            if text:
+                print("⚠️ Test case shard has no named test cases, keeping its text unmerged")
+                merged.append(text)
+            continue
+        for name, case in cases:
+            key = " ".join(name.split()).casefold()
+            if key not in seen:
+                seen.add(key)
+                merged.append(case)
+    print(f"✅ Merged {len(merged)} unique test cases from {len(responses)} shards")
+    return "\n---\n".join(merged)
+
+
+def write_test_cases(state:State):
+    """Generates test cases for the code based on functional and technical design documents."""
+    calls = test_cases_calls(state)
+    if len(calls) == 1:
+        return store_test_cases(state, invoke_chain(*calls[0]))
+    # Each shard runs in a copy of this node's context, so metrics and the scheduler see the node
+    with ThreadPoolExecutor(max_workers=min(len(calls), LLM_MAX_CONCURRENCY)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, invoke_chain, *call) for call in calls]
+        responses = [future.result() for future in futures]
+    return store_test_cases(state, merge_test_cases(responses))
+
+
+async def write_test_cases_async(state:State):
+    calls = test_cases_calls(state)
+    if len(calls) == 1:
+        return store_test_cases(state, await ainvoke_chain(*calls[0]))
+    responses = await asyncio.gather(*(ainvoke_chain(*call) for call in calls))
+    return store_test_cases(state, merge_test_cases(responses))
 
 
 def human_qa_review(state: State):
@@ -1111,14 +1864,34 @@ def human_qa_review(state: State):
     return state
 
 
+def code_review_fan_out(state:State):
+    """Parallel review mode: an approved code review starts security review and test case generation together."""
+    if code_review_human_decision(state) == "Denied":
+        return "Generate Code"
+    return ["Security Review", "Write Test Cases"]
+
+
+def test_cases_ready(state: State):
+    # No operation – gives "Human Test Cases Review" its own step after the security approval,
+    # resuming from one HITL pause straight into another would skip the second interrupt
+    return state
+
+
+def after_write_test_cases(state:State) -> Literal['Human Security Review', 'Human Test Cases Review']:
+    """Parallel review mode: join with the security review, unless this is a rewrite after test case review."""
+    if state.get("test_cases_review_status") == "Denied":
+        return "Human Test Cases Review"
+    return "Human Security Review"
+
+
 def qa_review_human_decision(state:State) -> Literal['Approve', 'Denied']:
     if state.get('qa_review_status') == 'Approve':
         return 'Approve'
     return 'Denied'
 
 
-def qa_testing(state: State):
-    """Conducts QA testing."""
+def qa_testing_prompt(state: State):
+    """Builds the (prompt, inputs, schema) call for the QA evaluation."""
     print("==> State", state)
 
     # Validate required state
@@ -1157,14 +1930,114 @@ def qa_testing(state: State):
         input_variables=["code","testcases"]
     )
 
-    chain_qa_test = prompt_qa_test | llm.with_structured_output(Review)
-    response = chain_qa_test.invoke({"code":code, "testcases":testcases})
+    return prompt_qa_test, {"code":code, "testcases":testcases}, Review
+
+
+def store_qa_review(state: State, response):
     state["qa_review_status"] = response.status
     state["qa_review_feedback"] = response.review
     
     return state
 
 
+def uses_pytest_qa() -> bool:
+    if QA_MODE != "pytest":
+        return False
+    if not qa_runner.pytest_available():
+        print("⚠️ SDLC_QA_MODE=pytest needs pytest, falling back to the LLM QA review")
+        return False
+    return True
+
+
+def pytest_prompt(state: State, test_cases: str, filename: str):
+    """Builds the call that turns a group of prose test cases into a runnable pytest file."""
+    prompt_pytest = PromptTemplate(
+        template="""You are a senior QA automation engineer. Turn the following test cases into runnable pytest tests for the project below.
+
+        ---
+        ### Project files (every module is importable by its file name, e.g. `import models` for models.py):
+        {code}
+
+        ### Test cases:
+        {test_cases}
+
+        ---
+        ### Rules:
+        - One test function per test case, named test_<snake_case of the test case name>.
+        - Import the project modules directly, they are on the Python path.
+        - Use only pytest, the standard library and the packages the project already imports.
+        - Replace external services (databases, HTTP APIs, email) with unittest.mock or in-memory fakes, tests must not use the network.
+        - Assert the expected result of each test case.
+
+        ### Output Format (strictly follow this):
+        Filename: {filename}
+        Code:
+        ```python
+        <Full pytest code>
+        ```
+
+        DO NOT include any explanations.
+        """,
+        input_variables=["code", "test_cases", "filename"]
+    )
+    return prompt_pytest, {"code": state["code"], "test_cases": test_cases, "filename": filename}, None
+
+
+def pytest_calls(state: State):
+    """
+    One pytest conversion call per QA_CASES_PER_FILE test cases. Empty when the test cases have
+    no `[Test Case Name]` headers to split on, the LLM QA review handles those.
+    """
+    if "code" not in state or not state["code"]:
+        raise KeyError("❌ 'code' not found in state or is empty. Code must be generated before QA Testing.")
+    cases = [case for _, case in split_test_cases(state.get("test_cases", ""))]
+    if not cases:
+        print("⚠️ No named test cases to convert to pytest, falling back to the LLM QA review")
+        return []
+    size = max(QA_CASES_PER_FILE, 1)
+    return [pytest_prompt(state, "\n---\n".join(cases[i:i + size]), f"test_qa_{i // size + 1}.py")
+            for i in range(0, len(cases), size)]
+
+
+def qa_calls(state: State):
+    """LLM calls of "QA Testing": pytest conversions in pytest mode, the simulated QA review otherwise."""
+    calls = pytest_calls(state) if uses_pytest_qa() else []
+    return calls or qa_testing_prompt(state)
+
+
+def store_pytest_qa_review(state: State, calls, responses):
+    """Runs the converted tests against the code in a temporary directory and stores the real results."""
+    test_files = [file for file in (planned_file_block(response, inputs["filename"])
+                                    for (_, inputs, _), response in zip(calls, responses)) if file]
+    if not test_files:
+        return store_qa_review(state, Review(status="Denied", review="No runnable pytest file could be generated from the test cases."))
+    report = qa_runner.run_tests(parse_files_from_response(str(state["code"])), test_files)
+    status, feedback = qa_runner.summarize_results(report)
+    print(f"🧪 {feedback.splitlines()[0]}")
+    return store_qa_review(state, Review(status=status, review=feedback))
+
+
+def qa_testing(state: State):
+    """Conducts QA testing."""
+    calls = pytest_calls(state) if uses_pytest_qa() else []
+    if not calls:
+        return store_qa_review(state, invoke_chain(*qa_testing_prompt(state)))
+    # Each conversion runs in a copy of this node's context, so metrics and the scheduler see the node
+    with ThreadPoolExecutor(max_workers=min(len(calls), LLM_MAX_CONCURRENCY)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, invoke_chain, *call) for call in calls]
+        responses = [future.result() for future in futures]
+    return store_pytest_qa_review(state, calls, responses)
+
+
+async def qa_testing_async(state: State):
+    calls = pytest_calls(state) if uses_pytest_qa() else []
+    if not calls:
+        return store_qa_review(state, await ainvoke_chain(*qa_testing_prompt(state)))
+    responses = await asyncio.gather(*(ainvoke_chain(*call) for call in calls))
+    # The test run blocks on subprocesses, keep the event loop free meanwhile
+    return await asyncio.to_thread(store_pytest_qa_review, state, calls, responses)
+
+
 def deployment(state: State):
     if state.get('qa_review_status') == 'Approve':
         state['deployment'] = 'deployed'
@@ -1174,103 +2047,360 @@ def deployment(state: State):
 from langgraph.graph import END, StateGraph, START
 
 
-graph_builder = StateGraph(State)
-
-# Define the nodes
-graph_builder.add_node("User Requirements", user_input_requirements)
-graph_builder.add_node("Auto-generate User Stories", auto_generate_user_stories)
-graph_builder.add_node("Human User Story Approval", human_user_story_approval)
-graph_builder.add_node("Create Design Document", create_design_document)
-graph_builder.add_node("Human Design Document Review", human_design_document_review)
-graph_builder.add_node("Generate Code", generate_code)
-graph_builder.add_node("Human Code Review", human_code_review)
-graph_builder.add_node("Security Review", security_review)
-graph_builder.add_node("Human Security Review", human_security_review)
-graph_builder.add_node("Write Test Cases", write_test_cases)
-graph_builder.add_node("Human Test Cases Review", human_test_cases_review)
-graph_builder.add_node("QA Testing", qa_testing)
-graph_builder.add_node("Human QA Review", human_qa_review)
-graph_builder.add_node("Deployment", deployment)
-
-# graph_builder.add_node("Fix Code after QA Feedback", fix_code_after_qa_feedback)
-# # graph_builder.add_node("Monitoring", monitoring)
-# # graph_builder.add_node("Requirement Change", requirement_change)
-
-
-
-
-graph_builder.add_edge(START, "User Requirements")
-graph_builder.add_edge("User Requirements", "Auto-generate User Stories")
-graph_builder.add_edge("Auto-generate User Stories", "Human User Story Approval")
-graph_builder.add_conditional_edges(
-    "Human User Story Approval",
-    user_story_human_decision,
-    {
-        "Approve": "Create Design Document",
-        "Denied": "Auto-generate User Stories"
-    }
-)
-graph_builder.add_edge("Create Design Document", "Human Design Document Review")
-graph_builder.add_conditional_edges(
-    "Human Design Document Review",
-    design_document_human_decision,
-    {
-        "Approve": "Generate Code",
-        "Denied": "Create Design Document"
-    }
-)
-graph_builder.add_edge("Generate Code", "Human Code Review")
-graph_builder.add_conditional_edges(
-    "Human Code Review",
-    code_review_human_decision,
-    {
-        "Approve": "Security Review",
-        "Denied": "Generate Code"
-    }
-)
-graph_builder.add_edge("Security Review", "Human Security Review")
-graph_builder.add_conditional_edges(
-    "Human Security Review",
-    security_review_human_decision,
-    {
-        "Approve": "Write Test Cases",
-        "Denied": "Generate Code"
-    }
-)
-graph_builder.add_edge("Write Test Cases", "Human Test Cases Review")
-graph_builder.add_conditional_edges(
-    "Human Test Cases Review",
-    test_cases_review_human_decision,
-    {
-        "Approve": "QA Testing",
-        "Denied": "Write Test Cases"
-    }
-)
-graph_builder.add_edge("QA Testing", "Human QA Review")
-graph_builder.add_conditional_edges(
-    "Human QA Review",
-    qa_review_human_decision,
-    {
-        "Approve": "Deployment",
-        "Denied": "Generate Code"
+def create_graph_builder(use_async: bool = False, parallel_review: bool = PARALLEL_REVIEW):
+    """
+    Builds the SDLC StateGraph.
+
+    Args:
+        use_async (bool): Use the `*_async` node variants, the compiled graph must then be
+            driven with `ainvoke` / `astream`.
+        parallel_review (bool): Fan out to "Security Review" and "Write Test Cases" after code
+            approval and join both before "Human Security Review". The test cases are then
+            reviewed right after the security review is approved.
+    """
+    graph_builder = StateGraph(State)
+
+    def add_node(name, node):
+        # Every node execution is timed for the metrics endpoint and the progress tracker
+        graph_builder.add_node(name, timed_node(name, node))
+
+    # Define the nodes
+    add_node("User Requirements", user_input_requirements)
+    add_node("Auto-generate User Stories", auto_generate_user_stories_async if use_async else auto_generate_user_stories)
+    add_node("Human User Story Approval", human_user_story_approval)
+    add_node("Create Design Document", create_design_document_async if use_async else create_design_document)
+    add_node("Human Design Document Review", human_design_document_review)
+    add_node("Generate Code", generate_code_async if use_async else generate_code)
+    add_node("Validate Code", validate_code_async if use_async else validate_code)
+    add_node("Human Code Review", human_code_review)
+    add_node("Security Review", security_review_async if use_async else security_review)
+    add_node("Human Security Review", human_security_review)
+    add_node("Write Test Cases", write_test_cases_async if use_async else write_test_cases)
+    add_node("Human Test Cases Review", human_test_cases_review)
+    add_node("QA Testing", qa_testing_async if use_async else qa_testing)
+    add_node("Human QA Review", human_qa_review)
+    add_node("Deployment", deployment)
+    if parallel_review:
+        add_node("Test Cases Ready", test_cases_ready)
+
+    # graph_builder.add_node("Fix Code after QA Feedback", fix_code_after_qa_feedback)
+    # # graph_builder.add_node("Monitoring", monitoring)
+    # # graph_builder.add_node("Requirement Change", requirement_change)
+
+    graph_builder.add_edge(START, "User Requirements")
+    graph_builder.add_edge("User Requirements", "Auto-generate User Stories")
+    graph_builder.add_edge("Auto-generate User Stories", "Human User Story Approval")
+    graph_builder.add_conditional_edges(
+        "Human User Story Approval",
+        user_story_human_decision,
+        {
+            "Approve": "Create Design Document",
+            "Denied": "Auto-generate User Stories"
+        }
+    )
+    graph_builder.add_edge("Create Design Document", "Human Design Document Review")
+    graph_builder.add_conditional_edges(
+        "Human Design Document Review",
+        design_document_human_decision,
+        {
+            "Approve": "Generate Code",
+            "Denied": "Create Design Document"
+        }
+    )
+    graph_builder.add_edge("Generate Code", "Validate Code")
+    graph_builder.add_edge("Validate Code", "Human Code Review")
+    if parallel_review:
+        graph_builder.add_conditional_edges(
+            "Human Code Review",
+            code_review_fan_out,
+            ["Security Review", "Write Test Cases", "Generate Code"]
+        )
+        # Both branches run in the same step, so "Human Security Review" runs once after both finished
+        graph_builder.add_edge("Security Review", "Human Security Review")
+        graph_builder.add_conditional_edges(
+            "Write Test Cases",
+            after_write_test_cases,
+            ["Human Security Review", "Human Test Cases Review"]
+        )
+        graph_builder.add_conditional_edges(
+            "Human Security Review",
+            security_review_human_decision,
+            {
+                "Approve": "Test Cases Ready",
+                "Denied": "Generate Code"
+            }
+        )
+        graph_builder.add_edge("Test Cases Ready", "Human Test Cases Review")
+    else:
+        graph_builder.add_conditional_edges(
+            "Human Code Review",
+            code_review_human_decision,
+            {
+                "Approve": "Security Review",
+                "Denied": "Generate Code"
+            }
+        )
+        graph_builder.add_edge("Security Review", "Human Security Review")
+        graph_builder.add_conditional_edges(
+            "Human Security Review",
+            security_review_human_decision,
+            {
+                "Approve": "Write Test Cases",
+                "Denied": "Generate Code"
+            }
+        )
+        graph_builder.add_edge("Write Test Cases", "Human Test Cases Review")
+    graph_builder.add_conditional_edges(
+        "Human Test Cases Review",
+        test_cases_review_human_decision,
+        {
+            "Approve": "QA Testing",
+            "Denied": "Write Test Cases"
+        }
+    )
+    graph_builder.add_edge("QA Testing", "Human QA Review")
+    graph_builder.add_conditional_edges(
+        "Human QA Review",
+        qa_review_human_decision,
+        {
+            "Approve": "Deployment",
+            "Denied": "Generate Code"
+        }
+    )
+    graph_builder.add_edge("Deployment", END)
+
+    return graph_builder
+
+
+HUMAN_REVIEW_NODES = ["Human User Story Approval", "Human Design Document Review", "Human Code Review", "Human Security Review", "Human Test Cases Review", "Human QA Review"]
+
+# Status and feedback fields set by the reviewer at each human review pause
+REVIEW_FIELDS = {
+    "Human User Story Approval": ("user_story_status", "user_story_feedback"),
+    "Human Design Document Review": ("design_document_review_status", "design_document_review_feedback"),
+    "Human Code Review": ("code_review_status", "code_review_feedback"),
+    "Human Security Review": ("security_review_status", "security_review_feedback"),
+    "Human Test Cases Review": ("test_cases_review_status", "test_cases_review_feedback"),
+    "Human QA Review": ("qa_review_status", "qa_review_feedback"),
+}
+
+
+def initial_state(requirements: str = "") -> State:
+    """Input state for a new pipeline thread, every review starts out approved."""
+    return {
+        "requirements": requirements,
+        "user_stories": [],
+        "user_story_status": "Approve",
+        "user_story_feedback": [],
+        "design_document": {},
+        "design_document_review_status": "Approve",
+        "design_document_review_feedback": [],
+        "code": "",
+        "code_review_status": "Approve",
+        "code_review_feedback": [],
+        "security_review_status": "Approve",
+        "security_review_feedback": "",
+        "test_cases": "",
+        "test_cases_review_status": "Approve",
+        "test_cases_review_feedback": [],
+        "qa_review_status": "Approve",
+        "qa_review_feedback": [],
+        "deployment": ""
     }
-)
-graph_builder.add_edge("Deployment", END)
+
+# Speculative pre-generation, see SDLC_SPECULATIVE
+# thread_id -> {cache key of the call: Future}, oldest threads are dropped first
+_speculations = OrderedDict()
+_speculation_lock = threading.RLock()
+_speculation_pool = None
+SPECULATIVE_MAX_THREADS = 64
+
+
+def next_stage_calls(human_node: str):
+    """
+    (node, builder) of every LLM stage that runs once `human_node` approves. A builder returns
+    the node's (prompt, inputs, schema) call, or a list of them when the node fans out.
+    """
+    if human_node == "Human User Story Approval":
+        return [("Create Design Document", design_document_prompt)]
+    if human_node == "Human Design Document Review":
+        return [("Generate Code", generate_code_prompt)]
+    if human_node == "Human Code Review":
+        if PARALLEL_REVIEW:
+            return [("Security Review", security_review_calls), ("Write Test Cases", test_cases_calls)]
+        return [("Security Review", security_review_calls)]
+    if human_node == "Human Security Review" and not PARALLEL_REVIEW:
+        return [("Write Test Cases", test_cases_calls)]
+    if human_node == "Human Test Cases Review":
+        return [("QA Testing", qa_calls)]
+    return []
+
+
+def speculation_llm_calls():
+    """The list collecting the LLM calls of the speculative run the caller executes in, None outside of one."""
+    try:
+        return get_config().get("configurable", {}).get("speculation_llm_calls")
+    except RuntimeError:
+        return None
+
+
+def is_speculative_run() -> bool:
+    return speculation_llm_calls() is not None
+
+
+def record_discarded_speculation(future):
+    """Done callback of a discarded speculation: its LLM calls count as discarded, not as thread usage."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    _, llm_calls = future.result()
+    for call in llm_calls:
+        if not call.get("cache_hit"):
+            metrics.record_discarded_speculation(call["node"], call["prompt_tokens"], call["completion_tokens"])
+
+
+def discard_speculations(futures):
+    """Cancels the speculations that have not started yet, running ones are recorded as discarded once done."""
+    for future in futures:
+        if not future.cancel():
+            future.add_done_callback(record_discarded_speculation)
+
+
+def take_speculation(prompt, inputs: dict, schema):
+    """
+    Returns the speculative future of this exact call for the current thread, or None. When the
+    thread has speculations but none for this call, the review was denied and they are discarded.
+    """
+    thread_id = current_thread_id()
+    if not SPECULATIVE or not thread_id or thread_id not in _speculations or is_speculative_run():
+        return None
+    key = make_cache_key(MODEL, prompt, inputs, schema)
+    with _speculation_lock:
+        pending = _speculations.get(thread_id, {})
+        future = pending.pop(key, None)
+        if future is None or not pending:
+            discarded = _speculations.pop(thread_id, {})
+    if future is None and discarded:
+        discard_speculations(discarded.values())
+        print(f"🗑️ Discarded {len(discarded)} speculative result(s) of thread {thread_id}")
+    return future
+
+
+def speculative_call(node: str, thread_id: str, prompt, inputs: dict, schema):
+    """
+    Runs the call as `node` of the thread behind interactive work. Returns (response, LLM calls),
+    the calls are recorded only if a node takes the result.
+    """
+    llm_calls = []
+    config = {"metadata": {"langgraph_node": node},
+              "configurable": {"thread_id": thread_id, "priority": "batch", "speculation_llm_calls": llm_calls}}
+    return RunnableLambda(lambda _: invoke_chain(prompt, inputs, schema)).invoke(None, config), llm_calls
+
+
+def get_speculation_pool():
+    global _speculation_pool
+    with _speculation_lock:
+        if _speculation_pool is None:
+            _speculation_pool = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="speculative")
+        return _speculation_pool
+
+
+def start_speculation(config, graph=None):
+    """
+    Call after a run paused at a human review: starts generating the stage that follows an
+    Approve from the paused state. The node reuses the result when its call is identical,
+    any other call of the thread (a Denied review) discards it. No-op unless SDLC_SPECULATIVE.
+
+    Returns:
+        The names of the nodes being generated.
+    """
+    if not SPECULATIVE:
+        return []
+    snapshot = (graph or get_graph()).get_state(config)
+    if not snapshot.next or snapshot.next[0] not in REVIEW_FIELDS:
+        return []
+    human_node = snapshot.next[0]
+    thread_id = config["configurable"]["thread_id"]
+    status_field, _ = REVIEW_FIELDS[human_node]
+    state = {**snapshot.values, status_field: "Approve"}
+
+    started = []
+    for node, build_calls in next_stage_calls(human_node):
+        try:
+            calls = build_calls(dict(state))
+        except Exception as e:
+            print(f"⚠️ Not speculating {node}: {e!r}")
+            continue
+        for prompt, inputs, schema in ([calls] if isinstance(calls, tuple) else calls):
+            key = make_cache_key(MODEL, prompt, inputs, schema)
+            with _speculation_lock:
+                pending = _speculations.setdefault(thread_id, {})
+                _speculations.move_to_end(thread_id)
+                while len(_speculations) > SPECULATIVE_MAX_THREADS:
+                    _, dropped = _speculations.popitem(last=False)
+                    discard_speculations(dropped.values())
+                if key in pending:
+                    continue
+                pending[key] = get_speculation_pool().submit(speculative_call, node, thread_id, prompt, inputs, schema)
+            if node not in started:
+                started.append(node)
+    if started:
+        print(f"🔮 Speculatively generating {', '.join(started)} during {human_node}")
+    return started
 
 
 # compile the graph
-memory = MemorySaver()
-graph = graph_builder.compile(interrupt_before=["Human User Story Approval", "Human Design Document Review", "Human Code Review", "Human Security Review", "Human Test Cases Review", "Human QA Review"], checkpointer=memory)
+_graphs = {}
+
+
+def get_checkpointer_instance():
+    """Checkpointer shared by `graph` and `async_graph`, so both see the same threads."""
+    with _build_lock:
+        if "memory" not in _graphs:
+            # SDLC_CHECKPOINTER=sqlite keeps paused review threads on disk across restarts
+            _graphs["memory"] = get_checkpointer()
+        return _graphs["memory"]
+
+
+def get_graph():
+    """Compiled sync pipeline, built on first use and cached for the process."""
+    with _build_lock:
+        if "graph" not in _graphs:
+            _graphs["graph"] = create_graph_builder().compile(
+                interrupt_before=HUMAN_REVIEW_NODES, checkpointer=get_checkpointer_instance())
+        return _graphs["graph"]
+
+
+def get_async_graph():
+    """
+    Same pipeline with async nodes, drive it with `await get_async_graph().ainvoke(...)` /
+    `astream(...)` to run many requirement threads concurrently on one event loop.
+    """
+    with _build_lock:
+        if "async_graph" not in _graphs:
+            _graphs["async_graph"] = create_graph_builder(use_async=True).compile(
+                interrupt_before=HUMAN_REVIEW_NODES, checkpointer=get_checkpointer_instance())
+        return _graphs["async_graph"]
+
+
+# `from sdlc_graph import graph` keeps working, the graph is built on first access instead of at import
+_LAZY_ATTRIBUTES = {"graph": get_graph, "async_graph": get_async_graph, "memory": get_checkpointer_instance}
+
 
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Save the PNG to a file
-# with open('react_graph.mmd', 'wb') as f:
-#     f.write(graph.get_graph().draw_mermaid_png())
-# print("Graph image saved as 'react_graph.png'. Open it to view the graph.")
-with open('react_graph.mmd', 'w') as f:
-    f.write(graph.get_graph().draw_mermaid())
-print("Graph Mermaid syntax saved as 'react_graph.mmd'. You can paste this into https://mermaid.live to view the graph.")
 
+def export_mermaid(path: str = "react_graph.mmd"):
+    """Writes the Mermaid syntax of the pipeline, paste it into https://mermaid.live to view the graph."""
+    # Save the PNG to a file
+    # with open('react_graph.mmd', 'wb') as f:
+    #     f.write(graph.get_graph().draw_mermaid_png())
+    # print("Graph image saved as 'react_graph.png'. Open it to view the graph.")
+    with open(path, 'w') as f:
+        f.write(get_graph().get_graph().draw_mermaid())
+    print(f"Graph Mermaid syntax saved as '{path}'. You can paste this into https://mermaid.live to view the graph.")
 
 
 thread = {
@@ -1279,4 +2409,19 @@ thread = {
     }
 }
 
-__all__ = ["State", "graph"]
+__all__ = ["State", "graph", "async_graph", "get_graph", "get_async_graph", "get_llm", "initial_state", "REVIEW_FIELDS"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SDLC graph utilities.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    mermaid = commands.add_parser("mermaid", help="Export the graph as Mermaid syntax")
+    mermaid.add_argument("output", nargs="?", default="react_graph.mmd", help="Output file")
+    args = parser.parse_args()
+
+    if args.command == "mermaid":
+        export_mermaid(args.output)
+
+
+if __name__ == "__main__":
+    main()
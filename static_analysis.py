@@ -0,0 +1,213 @@
+import ast
+import builtins
+import functools
+import os
+import re
+
+from code_parser import parse_files_from_response
+
+
+# "summary" hands the findings to the LLM security review, "gate" (opt-in) also denies blocking
+# findings without an LLM call, "off" disables the scanner
+STATIC_ANALYSIS = os.getenv("SDLC_STATIC_ANALYSIS", "summary").lower()
+
+SECRET_NAME_PATTERN = re.compile(r"(password|passwd|pwd|secret|token|api_?key|private_?key|access_?key|credential)", re.IGNORECASE)
+# Names that mention a secret without holding one, e.g. OAuth2PasswordBearer(tokenUrl="token")
+SECRET_NAME_EXCLUDE = re.compile(r"(url|uri|type|name|field|header|path|endpoint|prefix|length|algorithm|expire|scheme)", re.IGNORECASE)
+SECRET_VALUE_PATTERN = re.compile(r"^(AKIA[0-9A-Z]{16}|sk-[A-Za-z0-9_-]{20,}|gh[pousr]_[A-Za-z0-9]{30,}|xox[abpr]-[A-Za-z0-9-]{10,})$")
+SQL_PATTERN = re.compile(r"\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER)\b.*\b(FROM|INTO|SET|TABLE|WHERE|VALUES)\b", re.IGNORECASE | re.DOTALL)
+SQL_SINKS = {"execute", "executemany", "executescript", "raw", "text", "read_sql", "read_sql_query"}
+# Module attributes that are defined without an assignment
+MODULE_NAMES = {"__file__", "__name__", "__doc__", "__package__", "__spec__", "__loader__", "__builtins__", "__path__"}
+
+# Findings of these rules fail the gate, the others are only reported
+BLOCKING_RULES = {"syntax-error", "hardcoded-secret", "debug-mode", "sql-string-building", "missing-import"}
+
+
+def finding(rule: str, filename: str, node, message: str):
+    return {"rule": rule, "file": filename, "line": getattr(node, "lineno", 0), "message": message,
+            "blocking": rule in BLOCKING_RULES}
+
+
+def is_secret_name(name: str) -> bool:
+    return bool(SECRET_NAME_PATTERN.search(name)) and not SECRET_NAME_EXCLUDE.search(name)
+
+
+def literal_string(node):
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def target_names(target):
+    if isinstance(target, ast.Name):
+        return [target.id]
+    if isinstance(target, ast.Attribute):
+        return [target.attr]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [name for element in target.elts for name in target_names(element)]
+    return []
+
+
+def is_env_lookup(call: ast.Call) -> bool:
+    """os.getenv(...), os.environ.get(...)"""
+    func = call.func
+    if isinstance(func, ast.Attribute) and func.attr == "getenv":
+        return True
+    return (isinstance(func, ast.Attribute) and func.attr == "get"
+            and isinstance(func.value, ast.Attribute) and func.value.attr == "environ")
+
+
+def check_secrets(tree, filename: str):
+    findings = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            value = literal_string(node.value)
+            for name in (name for target in targets for name in target_names(target)):
+                if value and is_secret_name(name):
+                    findings.append(finding("hardcoded-secret", filename, node, f"`{name}` is assigned a hardcoded secret"))
+        elif isinstance(node, ast.Call):
+            if is_env_lookup(node) and len(node.args) >= 2:
+                key, default = literal_string(node.args[0]), literal_string(node.args[1])
+                if key and default and is_secret_name(key):
+                    findings.append(finding("hardcoded-secret", filename, node, f"`{key}` falls back to a hardcoded default"))
+            for keyword in node.keywords:
+                if keyword.arg and is_secret_name(keyword.arg) and literal_string(keyword.value):
+                    findings.append(finding("hardcoded-secret", filename, node, f"`{keyword.arg}=` is passed a hardcoded secret"))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args.posonlyargs + node.args.args
+            defaults = list(zip(arguments[len(arguments) - len(node.args.defaults):], node.args.defaults))
+            defaults += [(arg, default) for arg, default in zip(node.args.kwonlyargs, node.args.kw_defaults) if default]
+            for arg, default in defaults:
+                if is_secret_name(arg.arg) and literal_string(default):
+                    findings.append(finding("hardcoded-secret", filename, node, f"parameter `{arg.arg}` defaults to a hardcoded secret"))
+        value = literal_string(node)
+        if value and SECRET_VALUE_PATTERN.match(value):
+            findings.append(finding("hardcoded-secret", filename, node, "string literal looks like an access token"))
+    return findings
+
+
+def check_debug_mode(tree, filename: str):
+    findings = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            for keyword in node.keywords:
+                if keyword.arg == "debug" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True:
+                    findings.append(finding("debug-mode", filename, node, "debug mode is enabled (`debug=True`)"))
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and node.value.value is True:
+            if any(name.upper() == "DEBUG" for target in node.targets for name in target_names(target)):
+                findings.append(finding("debug-mode", filename, node, "`DEBUG = True` is hardcoded"))
+    return findings
+
+
+def built_string_literals(node):
+    """The literal parts of a string built at runtime, None when `node` is not a built string."""
+    if isinstance(node, ast.JoinedStr):
+        return "".join(literal_string(value) or "" for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        parts = [literal_string(side) or built_string_literals(side) or "" for side in (node.left, node.right)]
+        dynamic = not (literal_string(node.left) is not None and literal_string(node.right) is not None)
+        return "".join(parts) if dynamic else None
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format":
+        return literal_string(node.func.value)
+    return None
+
+
+def check_sql_building(tree, filename: str):
+    findings = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", "")
+        if name not in SQL_SINKS:
+            continue
+        literals = built_string_literals(node.args[0])
+        if literals and SQL_PATTERN.search(literals):
+            findings.append(finding("sql-string-building", filename, node,
+                                    f"SQL passed to `{name}()` is built from runtime values, use bound parameters"))
+    return findings
+
+
+def check_dangerous_calls(tree, filename: str):
+    findings = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if isinstance(node.func, ast.Name) and node.func.id in ("eval", "exec"):
+            findings.append(finding("dangerous-call", filename, node, f"`{node.func.id}()` executes dynamic code"))
+        for keyword in node.keywords:
+            if keyword.arg == "shell" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True:
+                findings.append(finding("dangerous-call", filename, node, "subprocess call with `shell=True`"))
+    return findings
+
+
+def bound_names(tree):
+    """Every name the module binds in any scope: imports, definitions, assignments, parameters."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+    return names
+
+
+def check_undefined_names(tree, filename: str):
+    """Names used but never imported or defined, e.g. `create_engine` without its import."""
+    known = bound_names(tree) | set(dir(builtins)) | MODULE_NAMES
+    if any(isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names) for node in ast.walk(tree)):
+        return []  # a star import can define anything
+    findings, reported = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in known and node.id not in reported:
+            reported.add(node.id)
+            findings.append(finding("missing-import", filename, node, f"`{node.id}` is used but never imported or defined"))
+    return findings
+
+
+RULES = [check_secrets, check_debug_mode, check_sql_building, check_undefined_names, check_dangerous_calls]
+
+
+@functools.lru_cache(maxsize=64)
+def analyze_code(code: str):
+    """Runs every rule on each file of a Filename/Code response. Cached, the code is scanned once per revision."""
+    findings = []
+    for file in parse_files_from_response(code):
+        try:
+            tree = ast.parse(file["code"], filename=file["filename"])
+        except SyntaxError as e:
+            findings.append(finding("syntax-error", file["filename"], e, f"syntax error: {e.msg}"))
+            continue
+        for rule in RULES:
+            findings.extend(rule(tree, file["filename"]))
+    return tuple(sorted(findings, key=lambda f: (not f["blocking"], f["file"], f["line"])))
+
+
+def format_findings(findings) -> str:
+    return "\n".join(f"- {f['file']}:{f['line']} [{f['rule']}] {f['message']}" for f in findings)
+
+
+def summarize_findings(findings) -> str:
+    """Condensed findings for the LLM security review."""
+    if not findings:
+        return "The local static analysis found no issues."
+    return f"The local static analysis reported {len(findings)} issue(s):\n" + format_findings(findings)
+
+
+def blocking_findings(code: str):
+    """Findings that deny the code before the LLM review, empty unless SDLC_STATIC_ANALYSIS=gate."""
+    if STATIC_ANALYSIS != "gate":
+        return []
+    return [f for f in analyze_code(str(code)) if f["blocking"]]
@@ -1,14 +1,30 @@
 # app.py
 import os
+import time
+from collections import deque
 import streamlit as st
 from dotenv import load_dotenv
-from langgraph.checkpoint.memory import MemorySaver
 from sdlc_graph import (
-    graph,  # your compiled LangGraph
-    State,  # your TypedDict state schema
+    get_graph,  # your compiled LangGraph, built once per process
+    initial_state,
+    split_test_cases,
+    start_speculation,
 )
+from code_parser import parse_files_from_response
+from metrics import metrics, start_metrics_server
+from job_runner import job_runner
+
+# How often the page polls a running graph job for progress
+JOB_POLL_SECONDS = float(os.getenv("SDLC_JOB_POLL_SECONDS", "0.5"))
+# Test cases shown per page of the Test Cases tab
+TEST_CASES_PER_PAGE = int(os.getenv("SDLC_UI_TEST_CASES_PER_PAGE", "10"))
+# Node events kept per session, older ones are dropped
+EVENT_LOG_SIZE = int(os.getenv("SDLC_EVENT_LOG_SIZE", "50"))
 
 st.set_page_config(page_title="AI SDLC Wizard", layout="wide")
+# Prometheus endpoint, only when SDLC_METRICS_PORT is set (started once per process)
+start_metrics_server()
+graph = get_graph()
 logo_path = "images/logo.png" 
 st.image(logo_path, width=200)
 st.title("DemoJam Red Hat One 2026")
@@ -18,29 +34,57 @@ st.markdown("""## Agentic AI System for Software Deveopment Lifycle Automation""
 # Initialize session state
 if "thread" not in st.session_state:
     import uuid
-    st.session_state.thread = {"configurable": {"thread_id": str(uuid.uuid4())}}
-    st.session_state.state = {
-        "requirements": "",
-        "user_stories": [],
-        "user_story_status": "Approve",
-        "user_story_feedback": [],
-        "design_document": {},
-        "design_document_review_status": "Approve",
-        "design_document_review_feedback": [],
-        "code": "",
-        "code_review_status": "Approve",
-        "code_review_feedback": [],
-        "security_review_status": "Approve",
-        "security_review_feedback": "",
-        "test_cases": "",
-        "test_cases_review_status": "Approve",
-        "test_cases_review_feedback": [],
-        "qa_review_status": "Approve",
-        "qa_review_feedback": [],
-        "deployment": ""
-    }
+    # The thread id is kept in the URL, so a browser refresh reattaches to the thread and its running job
+    thread_id = st.query_params.get("thread") or str(uuid.uuid4())
+    st.query_params["thread"] = thread_id
+    st.session_state.thread = {"configurable": {"thread_id": thread_id}}
     st.session_state.active_node = "User Requirements"
-    st.session_state.events = []
+    # Compact, bounded log of node events: name, time and a hash per artifact, never the artifacts
+    st.session_state.events = deque(maxlen=EVENT_LOG_SIZE)
+    # Human review node the thread is paused at, shown by the tracker while interrupted
+    st.session_state.last_human_node = ""
+    # Number of events of the current job already added to the event log
+    st.session_state.applied_events = 0
+
+# StateSnapshot of this session's thread, read from the checkpointer at most once per rerun
+rerun_snapshot = []
+
+
+def thread_state():
+    """
+    The graph state of this session's thread. The checkpointer is the only copy of the state,
+    the session keeps none; tabs read just the fields they display through `state_field`.
+    """
+    if not rerun_snapshot:
+        rerun_snapshot.append(graph.get_state(st.session_state.thread))
+    return rerun_snapshot[0]
+
+
+def state_field(name: str, default=None):
+    return thread_state().values.get(name, default)
+
+
+if st.session_state.active_node == "User Requirements" and thread_state().next:
+    # A thread started before a browser refresh, paused at a review
+    st.session_state.active_node = "__interrupt__"
+    st.session_state.last_human_node = thread_state().next[0]
+
+
+def sync_job(job):
+    """Adds the node events the background job produced since the last rerun to the event log."""
+    for event in job.events_since(st.session_state.applied_events):
+        st.session_state.events.append(event)
+        st.session_state.active_node = event["node"]
+        st.session_state.applied_events += 1
+    if not job.running and job.next_nodes:
+        st.session_state.last_human_node = job.next_nodes[0]
+
+
+job = job_runner.get(st.session_state.thread["configurable"]["thread_id"])
+if job is not None:
+    sync_job(job)
+# Review buttons are disabled while the graph runs, the thread can only be resumed once paused
+busy = job is not None and job.running
 
 # Display visual progress tracker
 flow_order = [
@@ -50,6 +94,7 @@ flow_order = [
     "Create Design Document",
     "Human Design Document Review",
     "Generate Code",
+    "Validate Code",
     "Human Code Review",
     "Security Review",
     "Human Security Review",
@@ -61,25 +106,22 @@ flow_order = [
     "Deployment"
 ]
 
+flow_position = {node: index for index, node in enumerate(flow_order)}
+
 # Helper to determine which node should be yellow
 def get_current_node():
     active_node = st.session_state.get("active_node", "")
     
     if active_node == "__interrupt__":
-        # Walk backwards in event history to find the last known human node
-        for event in reversed(st.session_state.get("events", [])):
-            for node_name in event:
-                if node_name in flow_order:
-                    return node_name
-        return ""  # fallback
+        # The review the thread is paused at, recorded when the run finished
+        return st.session_state.get("last_human_node", "")
     return active_node
 
 # Updated badge function
-def progress_badge(node):
-    current = get_current_node()
-    if current not in flow_order:
+def progress_badge(node, current):
+    if current not in flow_position:
         return "🔘"
-    if flow_order.index(node) < flow_order.index(current):
+    if flow_position[node] < flow_position[current]:
         return "✅"
     elif node == current:
         return "⌛"
@@ -93,36 +135,130 @@ current_node = get_current_node()
 st.caption(f"✅ Completed  |  ⌛ In Progress  |  ⚪ Not Started      💡 Go to: **{current_node}**" if current_node else "✅ Completed  |  ⌛ In Progress  |  ⚪ Not Started")
 
 # Render the flow with badges
-st.markdown(" → ".join(f"{progress_badge(n)} {n}" for n in flow_order))
+st.markdown(" → ".join(f"{progress_badge(n, current_node)} {n}" for n in flow_order))
+
+def event_rows(events):
+    """One row per node event with the artifacts whose hash differs from the previous event's."""
+    rows, hashes = [], {}
+    for event in events:
+        changed = [field for field, digest in event["artifacts"].items() if hashes.get(field) != digest]
+        hashes.update(event["artifacts"])
+        rows.append({
+            "Time": time.strftime("%H:%M:%S", time.localtime(event["timestamp"])),
+            "Node": event["node"],
+            "Changed artifacts": ", ".join(changed),
+        })
+    return rows
+
+
+# Per-node latency and token usage of this session's thread
+thread_metrics = metrics.thread_summary(st.session_state.thread["configurable"]["thread_id"])
+if thread_metrics:
+    with st.expander("⏱️ Performance"):
+        st.table([
+            {
+                "Node": node,
+                "Runs": values["runs"],
+                "Time (s)": round(values["seconds"], 2),
+                "LLM calls": values["llm_calls"],
+                "Queue (s)": round(values["queue_seconds"], 2),
+                "Prompt tokens": values["prompt_tokens"],
+                "Completion tokens": values["completion_tokens"],
+                "Cache hits": values["cache_hits"],
+                "Retries": values["retries"],
+            }
+            for node, values in sorted(thread_metrics.items(), key=lambda item: flow_position.get(item[0], len(flow_order)))
+        ])
+        if st.session_state.events:
+            st.caption(f"Last {len(st.session_state.events)} node events of this session, newest first")
+            st.table(list(reversed(event_rows(st.session_state.events))))
+
+
+
+def run_graph(graph_input):
+    """
+    Starts the graph on the background job runner until the next human review pause and
+    returns immediately, the page polls the job for progress.
+    """
+    # SDLC_SPECULATIVE: once paused, generate the next stage while the reviewer reads this one
+    _, created = job_runner.submit(graph, graph_input, st.session_state.thread, on_finish=start_speculation)
+    if created:
+        # A running job (e.g. after a double click) keeps its events, they were partly applied already
+        st.session_state.applied_events = 0
+
+
+def job_progress():
+    """Shows the running node and its live LLM output, reruns the page once the job finished."""
+    job = job_runner.get(st.session_state.thread["configurable"]["thread_id"])
+    if job is None or not job.running:
+        st.rerun()
+    node, texts = job.progress()
+    st.caption(f"⌛ {node or 'Starting'} ...")
+    # Concurrent LLM calls of the node (parallel codegen, test case shards) are shown one after the other
+    for i, text in enumerate(texts, 1):
+        if len(texts) > 1:
+            st.caption(f"LLM call {i} of {len(texts)}")
+        st.markdown(text + "▌")
+
+
+if busy:
+    # Only this fragment reruns while polling, the tabs below are not re-rendered
+    st.fragment(run_every=JOB_POLL_SECONDS)(job_progress)()
+elif job is not None and job.status == "error":
+    st.error(f"❌ The graph run failed: {job.error}")
+
+
+def paginate(items, page_size: int, key: str):
+    """The items of the page picked by a page selector, which is only shown when there are several pages."""
+    pages = max((len(items) + page_size - 1) // page_size, 1)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    return items[(page - 1) * page_size:page * page_size], (page - 1) * page_size
+
+
+def render_code(code):
+    """File tree of generated_code/ and the content of the selected file only."""
+    files = parse_files_from_response(code)
+    if not files:
+        st.code(code)
+        return
+    tree_column, file_column = st.columns([1, 3])
+    with tree_column:
+        st.markdown("📁 **generated_code/**")
+        labels = [f"📄 {file['filename']} ({file['code'].count(chr(10)) + 1} lines)" for file in files]
+        selected = st.radio("Files", range(len(files)), format_func=labels.__getitem__, key="code_file", label_visibility="collapsed")
+    with file_column:
+        st.code(files[selected]["code"], language="python")
+
 
+def render_test_cases(test_cases):
+    cases = split_test_cases(test_cases)
+    if not cases:
+        st.text_area("Test Cases:", test_cases, height=300, key="test_cases_display")
+        return
+    st.caption(f"{len(cases)} test cases")
+    page, offset = paginate(cases, TEST_CASES_PER_PAGE, key="test_cases_page")
+    for i, (name, case) in enumerate(page, offset + 1):
+        with st.expander(f"{i}. {name}"):
+            st.text(case)
 
 
-# Tab-based layout
-tabs = st.tabs(["User Requirements", "User Stories", "Design Document", "Code", "Test Cases", "Security", "QA", "Code Commit", "Deployment"])
-state = st.session_state.state
+# Section layout: only the selected section renders, large artifacts are not sent to the browser on every rerun
+TABS = ["User Requirements", "User Stories", "Design Document", "Code", "Test Cases", "Security", "QA", "Code Commit", "Deployment"]
+active_tab = st.radio("Section", TABS, horizontal=True, key="active_tab", label_visibility="collapsed")
 
-with tabs[0]:
+if active_tab == TABS[0]:
     st.header("📋 User Requirements")
-    requirements = st.text_area("Enter Requirements:", state.get("requirements", ""), key="requirements_input")
-    if st.button("Submit Requirements", key="requirements_submit"):
-        # Update state with new requirements
-        state['requirements'] = requirements
-        st.session_state.state = state
-        
+    requirements = st.text_area("Enter Requirements:", state_field("requirements", ""), key="requirements_input")
+    if st.button("Submit Requirements", key="requirements_submit", disabled=busy):
         # Start the graph stream
-        for event in graph.stream(state, st.session_state.thread):
-            st.session_state.events.append(event)
-            for node, output in event.items():
-                if isinstance(output, dict):
-                    st.session_state.state.update(output)
-                st.session_state.active_node = node
+        run_graph(initial_state(requirements))
         st.rerun()
 
 
-with tabs[1]:
+if active_tab == TABS[1]:
     st.header("📘 User Stories")
     # Display user stories
-    user_stories = st.session_state.state.get("user_stories", [])
+    user_stories = state_field("user_stories", [])
     for i, story in enumerate(user_stories, 1):
         st.markdown(f"**{i}.** {story}")
     
@@ -130,7 +266,7 @@ with tabs[1]:
     if user_stories:
         status = st.radio("Approve the User Stories?", ["Approve", "Denied"], key="user_stories_approval")
         feedback = st.text_area("Feedback (if denied):", key="user_stories_feedback")
-        if st.button("Continue from User Story Review", key="user_stories_continue"):
+        if st.button("Continue from User Story Review", key="user_stories_continue", disabled=busy):
             # Update state with review decision
             graph.update_state(
                 st.session_state.thread,
@@ -138,17 +274,12 @@ with tabs[1]:
                 as_node="Human User Story Approval"
             )
             # Continue graph execution
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[2]:
+if active_tab == TABS[2]:
     st.header("📐 Design Document")
-    doc = st.session_state.state.get("design_document", {})
+    doc = state_field("design_document", {})
     
     # Display design document sections
     sections = ["functional", "technical", "assumptions", "open_questions"]
@@ -170,94 +301,74 @@ with tabs[2]:
     if has_content:
         status = st.radio("Approve the Design Document?", ["Approve", "Denied"], key="design_doc_approval")
         feedback = st.text_area("Feedback (if denied):", key="design_doc_feedback")
-        if st.button("Continue from Design Document Review", key="design_doc_continue"):
+        if st.button("Continue from Design Document Review", key="design_doc_continue", disabled=busy):
             graph.update_state(
                 st.session_state.thread,
                 {"design_document_review_status": status, "design_document_review_feedback": [feedback]},
                 as_node="Human Design Document Review"
             )
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[3]:
+if active_tab == TABS[3]:
     st.header("💻 Generated Code")
-    code = st.session_state.state.get("code", "No code generated yet.")
-    st.code(code)
+    code = state_field("code", "No code generated yet.")
+    render_code(code)
     
     # Show approval UI if we have code
     if code and code != "No code generated yet.":
         status = st.radio("Approve the Code?", ["Approve", "Denied"], key="code_approval")
         feedback = st.text_area("Feedback (if denied):", key="code_feedback")
-        if st.button("Continue from Code Review", key="code_continue"):
+        if st.button("Continue from Code Review", key="code_continue", disabled=busy):
             graph.update_state(
                 st.session_state.thread,
                 {"code_review_status": status, "code_review_feedback": [feedback]},
                 as_node="Human Code Review"
             )
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[4]:
+if active_tab == TABS[4]:
     st.header("🧪 Test Cases")
-    test_cases = st.session_state.state.get("test_cases", "No test cases yet.")
-    st.text_area("Test Cases:", test_cases, height=300, key="test_cases_display")
+    test_cases = state_field("test_cases", "No test cases yet.")
+    render_test_cases(test_cases)
     
     # Show approval UI if we have test cases
     if test_cases and test_cases != "No test cases yet.":
         status = st.radio("Approve the Test Cases?", ["Approve", "Denied"], key="test_cases_approval")
         feedback = st.text_area("Feedback (if denied):", key="test_cases_feedback")
-        if st.button("Continue from Test Case Review", key="test_cases_continue"):
+        if st.button("Continue from Test Case Review", key="test_cases_continue", disabled=busy):
             graph.update_state(
                 st.session_state.thread,
                 {"test_cases_review_status": status, "test_cases_review_feedback": [feedback]},
                 as_node="Human Test Cases Review"
             )
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[5]:
+if active_tab == TABS[5]:
     st.header("🔒 Security Review")
     st.write("**Security Feedback:**")
-    security_feedback = st.session_state.state.get("security_review_feedback", "N/A")
+    security_feedback = state_field("security_review_feedback", "N/A")
     st.markdown(security_feedback)
     
     # Show approval UI if we have security feedback
     if security_feedback and security_feedback != "N/A":
         status = st.radio("Approve Security Review?", ["Approve", "Denied"], key="security_approval")
         security_feedback_text = st.text_area("Feedback (if denied):", key="security_feedback")
-        if st.button("Continue from Security Review", key="security_continue"):
+        if st.button("Continue from Security Review", key="security_continue", disabled=busy):
             graph.update_state(
                 st.session_state.thread,
                 {"security_review_status": status, "security_feedback": security_feedback_text},
                 as_node="Human Security Review"
             )
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[6]:
+if active_tab == TABS[6]:
     st.header("✅ QA Review")
     st.write("**QA Feedback:**")
-    qa_feedback = st.session_state.state.get("qa_review_feedback", [])
+    qa_feedback = state_field("qa_review_feedback", [])
     if isinstance(qa_feedback, list):
         # Join list items with newlines
         feedback_text = "\n".join(qa_feedback)
@@ -272,30 +383,25 @@ with tabs[6]:
     if qa_feedback:
         status = st.radio("Approve QA Testing?", ["Approve", "Denied"], key="qa_approval_1")
         feedback = st.text_area("Feedback (if denied):", key="qa_feedback_1")
-        if st.button("Continue from QA Review", key="qa_continue_1"):
+        if st.button("Continue from QA Review", key="qa_continue_1", disabled=busy):
             graph.update_state(
                 st.session_state.thread,
                 {"qa_review_status": status, "qa_review_feedback": [feedback]},
                 as_node="Human QA Review"
             )
-            for event in graph.stream(None, st.session_state.thread):
-                st.session_state.events.append(event)
-                for node, output in event.items():
-                    if isinstance(output, dict):
-                        st.session_state.state.update(output)
-                    st.session_state.active_node = node
+            run_graph(None)
             st.rerun()
 
-with tabs[7]:
+if active_tab == TABS[7]:
     st.header("💡 Code Commit")
-    if state.get("deployment"):
+    if state_field("deployment"):
         st.success("Code successfully pushed to Git!")
     else:
         st.warning("Error Occured while pushing code to Git.")
 
-with tabs[8]:
+if active_tab == TABS[8]:
     st.header("🚀 Deployment")
-    if state.get("deployment"):
+    if state_field("deployment"):
         st.success("Application successfully deployed!")
     else:
         st.warning("Not yet deployed. Complete QA to trigger deployment.")
@@ -0,0 +1,60 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import END, START, StateGraph
+
+from checkpointer import CompressedSerializer, SqliteSaver
+
+
+THREADS = 8
+
+
+def payload(i: int) -> str:
+    # Large and distinct per thread, so every value takes the compressed path
+    return "".join(f"def function_{i}_{n}(value):\n    return value * {n}\n" for n in range(400))
+
+
+def test_serializer_round_trip_from_many_threads():
+    serde = CompressedSerializer()
+
+    def round_trip(i):
+        for _ in range(50):
+            value = {"code": payload(i), "index": i}
+            type_, data = serde.dumps_typed(value)
+            assert type_ == "msgpack+zstd"
+            assert serde.loads_typed((type_, data)) == value
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(round_trip, range(THREADS * 4)))
+
+
+class State(TypedDict):
+    code: str
+    rounds: int
+
+
+def test_saver_round_trip_from_many_threads(tmp_path):
+    saver = SqliteSaver(str(tmp_path / "checkpoints.db"))
+    builder = StateGraph(State)
+    builder.add_node("write", lambda state: {"code": state["code"] + "# reviewed\n", "rounds": state["rounds"] + 1})
+    builder.add_edge(START, "write")
+    builder.add_edge("write", END)
+    graph = builder.compile(checkpointer=saver)
+
+    def run(i):
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+        for _ in range(3):
+            graph.invoke({"code": payload(i), "rounds": 0}, config)
+        return graph.get_state(config).values
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(run, range(THREADS * 2)))
+
+    for i, values in enumerate(results):
+        assert values == {"code": payload(i) + "# reviewed\n", "rounds": 1}
+        history = list(graph.get_state_history({"configurable": {"thread_id": f"thread-{i}"}}))
+        assert all(snapshot.values.get("code", payload(i)).startswith(payload(i)) for snapshot in history)
@@ -0,0 +1,96 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_parser import StreamingFileParser, is_valid_filename, parse_files_from_response, render_files, replace_files
+
+
+RESPONSE = """Here is the project.
+
+Filename: models.py
+Code:
+```python
+class User:
+    pass
+```
+
+Filename: requirements.txt
+Code:
+```text
+flask
+```
+
+Filename:   app.py
+Code:
+```
+from models import User
+```
+Done."""
+
+FILES = [
+    {"filename": "models.py", "code": "class User:\n    pass"},
+    {"filename": "app.py", "code": "from models import User"},
+]
+
+
+def feed_in_chunks(text: str, size: int):
+    emitted = []
+    parser = StreamingFileParser(on_file=emitted.append)
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser.close(), emitted
+
+
+def test_parse_files_from_response():
+    assert parse_files_from_response(RESPONSE) == FILES
+
+
+def test_streaming_parser_handles_headers_and_fences_split_across_chunks():
+    # Size 1 splits every header and fence, larger sizes split them at varying offsets
+    for size in range(1, 40):
+        files, emitted = feed_in_chunks(RESPONSE, size)
+        assert files == FILES, size
+        assert emitted == FILES, size
+
+
+def test_streaming_parser_emits_a_file_once_its_fence_closes():
+    parser = StreamingFileParser()
+    assert parser.feed("Filename: models.py\nCode:\n```python\nclass User:\n") == []
+    assert parser.feed("    pass\n`") == []
+    assert parser.feed("``\n\nFilename: app.py") == [FILES[0]]
+    assert parser.feed("\nCode:\n```python\nfrom models import User\n```") == [FILES[1]]
+
+
+def test_streaming_parser_does_not_rescan_prose():
+    parser = StreamingFileParser()
+    for _ in range(1000):
+        parser.feed("some prose without a header ")
+    assert parser.scan_from > len(parser.buffer) - len("Filename:")
+
+    parser.feed("Filename: a.py\nCode:\n```python\nA = 1\n```")
+    assert parser.files == [{"filename": "a.py", "code": "A = 1"}]
+
+
+def test_unnamed_code_block_falls_back_to_main_py():
+    assert parse_files_from_response("```python\nprint('hi')\n```") == [{"filename": "main.py", "code": "print('hi')"}]
+
+
+def test_is_valid_filename():
+    assert is_valid_filename("user_service.py")
+    assert not is_valid_filename("../evil.py")
+    assert not is_valid_filename("app/main.py")
+    assert not is_valid_filename("requirements.txt")
+
+
+def test_render_files_round_trip():
+    assert parse_files_from_response(render_files(FILES)) == FILES
+
+
+def test_replace_files_keeps_other_blocks():
+    code = replace_files(RESPONSE, [{"filename": "app.py", "code": "APP = 1"}, {"filename": "auth.py", "code": "TTL = 60"}])
+
+    assert "Filename: requirements.txt\nCode:\n```text\nflask\n```" in code
+    assert code.startswith("Here is the project.")
+    assert parse_files_from_response(code) == [FILES[0], {"filename": "app.py", "code": "APP = 1"},
+                                               {"filename": "auth.py", "code": "TTL = 60"}]
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_validation import declared_packages, module_interfaces, package_key, validate_files
+
+
+FILES = [
+    {"filename": "models.py", "code": "import json\n\nclass User:\n    pass\n\nDEFAULT_ROLE = 'user'\n"},
+    {"filename": "app.py", "code": "from flask import Flask\nfrom models import User, DEFAULT_ROLE\n\napp = Flask(__name__)\n"},
+]
+
+REQUIREMENTS = "Filename: requirements.txt\nCode:\n```text\nFlask==3.0\npython-jose[cryptography]>=3.3  # JWT\n\n# comment\n```\n"
+
+
+def test_valid_project_has_no_issues():
+    assert validate_files(FILES) == {}
+    assert validate_files(FILES, {"flask"}) == {}
+
+
+def test_syntax_errors_are_reported():
+    issues = validate_files([{"filename": "broken.py", "code": "def broken(:\n    pass\n"}])
+    assert list(issues) == ["broken.py"]
+    assert issues["broken.py"][0].startswith("line 1: syntax error")
+
+    # Accepted by ast.parse, rejected by compile()
+    assert "syntax error" in validate_files([{"filename": "a.py", "code": "return 1\n"}])["a.py"][0]
+
+
+def test_imports_of_generated_modules_must_resolve():
+    files = FILES + [{"filename": "routes.py", "code": "from models import Account\nimport models\n"}]
+    assert validate_files(files) == {"routes.py": ["line 1: imports `Account` from `models`, which does not define it"]}
+
+
+def test_undeclared_packages_are_reported_once_when_packages_are_declared():
+    files = [{"filename": "db.py", "code": "from sqlalchemy import create_engine\nfrom sqlalchemy import text\nimport os\n"}]
+
+    assert validate_files(files) == {}
+    assert validate_files(files, {"flask"}) == {
+        "db.py": ["line 1: imports `sqlalchemy`, which is neither a generated module nor a declared package"],
+    }
+
+
+def test_imports_guarded_by_import_error_are_optional():
+    files = [{"filename": "speedups.py", "code": "try:\n    import ujson as json\nexcept ImportError:\n    import json\n"}]
+    assert validate_files(files, set()) == {}
+
+
+def test_undefined_names_are_reported():
+    files = [{"filename": "db.py", "code": "engine = create_engine('sqlite://')\n"}]
+    assert validate_files(files) == {"db.py": ["line 1: `create_engine` is used but never imported or defined"]}
+
+
+def test_declared_packages():
+    assert declared_packages("Filename: app.py\nCode:\n```python\nA = 1\n```") is None
+    assert declared_packages(REQUIREMENTS) == {"flask", "jose"}
+    assert package_key("Flask-Login") == package_key("flask_login")
+
+
+def test_module_interfaces():
+    assert module_interfaces(FILES) == "- models: User, DEFAULT_ROLE\n- app: app"
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel
+
+from llm_cache import LLMCache, decode_response, encode_response, get_llm_cache, make_cache_key
+
+
+PROMPT = PromptTemplate.from_template("Write user stories for {requirements}")
+
+
+class Stories(BaseModel):
+    stories: List[str]
+
+
+def test_cache_key_depends_on_every_part_of_the_call():
+    key = make_cache_key("model-a", PROMPT, {"requirements": "a todo app"})
+
+    assert key == make_cache_key("model-a", PROMPT, {"requirements": "a todo app"})
+    assert key != make_cache_key("model-b", PROMPT, {"requirements": "a todo app"})
+    assert key != make_cache_key("model-a", PROMPT, {"requirements": "a bank app"})
+    assert key != make_cache_key("model-a", PROMPT, {"requirements": "a todo app"}, Stories)
+    other_template = PromptTemplate.from_template("Write user stories for {requirements}.")
+    assert key != make_cache_key("model-a", other_template, {"requirements": "a todo app"})
+
+
+def test_response_encoding_round_trip():
+    message = AIMessage(content="Filename: app.py\nCode:\n```python\nAPP = 1\n```")
+    assert decode_response(encode_response(message)) == AIMessage(content=message.content)
+
+    stories = Stories(stories=["As a user, I want to log in"])
+    assert decode_response(encode_response(stories), Stories) == stories
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = LLMCache(max_entries=2)
+    cache.set("a", {"kind": "message", "content": "A"})
+    cache.set("b", {"kind": "message", "content": "B"})
+    cache.get("a")
+    cache.set("c", {"kind": "message", "content": "C"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"kind": "message", "content": "A"}
+    assert cache.stats["evictions"] == 1
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "cache" / "llm_cache.db")
+    LLMCache(max_entries=0, disk_path=path).set("key", encode_response(AIMessage(content="cached")))
+
+    cache = LLMCache(max_entries=0, disk_path=path)
+    assert decode_response(cache.get("key")).content == "cached"
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_disk_entries_expire(tmp_path):
+    cache = LLMCache(max_entries=0, disk_path=str(tmp_path / "llm_cache.db"), ttl_seconds=60)
+    cache.set("key", {"kind": "message", "content": "old"})
+    cache.conn.execute("UPDATE responses SET created_at = ?", (time.time() - 120,))
+
+    assert cache.get("key") is None
+
+
+def test_get_llm_cache_tiers():
+    assert get_llm_cache("off") is None
+    assert get_llm_cache("memory").conn is None
+    with pytest.raises(ValueError):
+        get_llm_cache("redis")
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+
+from llm_scheduler import LLMScheduler, TokenBucket
+
+
+def http_error(status: int, headers=None):
+    request = httpx.Request("POST", "http://llm.local/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def test_token_bucket_without_rate_never_waits():
+    bucket = TokenBucket(0)
+    bucket.take(1_000_000)
+    assert bucket.wait_time(1_000_000, now=bucket.updated) == 0.0
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60)  # one unit per second
+    start = bucket.updated
+    assert bucket.wait_time(60, now=start) == 0.0
+
+    bucket.take(60)
+    assert bucket.wait_time(1, now=start) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=start + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now=start + 1) == 0.0
+
+
+def test_token_bucket_refill_is_capped_and_large_requests_wait_for_a_full_bucket():
+    bucket = TokenBucket(60)
+    start = bucket.updated
+    bucket.take(90)  # may go negative, e.g. completion tokens debited after a call
+
+    assert bucket.wait_time(1000, now=start) == pytest.approx(90.0)
+    assert bucket.wait_time(0, now=start + 1000) == 0.0
+    assert bucket.level == 60
+
+
+def test_retry_delay_backs_off_retryable_errors():
+    scheduler = LLMScheduler(max_retries=3, backoff_base=1, backoff_max=5)
+
+    for attempt in range(3):
+        delay = scheduler.retry_delay(http_error(503), attempt)
+        assert 0 <= delay <= min(5, 2 ** attempt)
+    assert 0 <= scheduler.retry_delay(httpx.ConnectError("refused"), 0) <= 1
+
+
+def test_retry_delay_gives_up():
+    scheduler = LLMScheduler(max_retries=2)
+
+    assert scheduler.retry_delay(http_error(503), 2) is None
+    assert scheduler.retry_delay(http_error(400), 0) is None
+    assert scheduler.retry_delay(ValueError("bad output"), 0) is None
+    assert scheduler.retry_delay(http_error(503), 0, output_started=True) is None
+
+
+def test_retry_after_pauses_every_caller():
+    scheduler = LLMScheduler(backoff_base=0.5)
+
+    delay = scheduler.retry_delay(http_error(429, {"retry-after": "2"}), 0)
+
+    assert 2 <= delay <= 2.5
+    assert scheduler.limited()
+    assert scheduler.paused_until > time.monotonic() + 1.5
+
+
+def test_run_retries_until_the_call_succeeds():
+    scheduler = LLMScheduler(max_retries=3, backoff_base=0)
+    attempts = []
+
+    def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise http_error(502)
+        return "ok"
+
+    result, _, retries = scheduler.run(call)
+    assert (result, retries, len(attempts)) == ("ok", 2, 3)
@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.prompts import PromptTemplate
+
+from prompt_budget import count_tokens, fit_prompt, prompt_token_counts
+
+
+PROMPT = PromptTemplate.from_template("Fix the code.\n{feedback}\n{old_test_cases}\n{previous_code}")
+
+
+def module(name: str, lines: int) -> str:
+    body = "\n".join(f"    value_{n} = {n}" for n in range(lines))
+    return f'Filename: {name}.py\nCode:\n```python\ndef {name}_handler():\n    """Handles {name}."""\n{body}\n```'
+
+
+def inputs(code_lines: int = 10, feedback_entries: int = 3):
+    return {
+        "feedback": [f"round {n}: rename the handler" for n in range(feedback_entries)],
+        "old_test_cases": "[Test Case Name]: Login works\n[Steps]: " + "step " * 50,
+        "previous_code": "\n\n".join([module("auth", code_lines), module("billing", code_lines)]),
+    }
+
+
+def rendered_tokens(fitted: dict) -> int:
+    return count_tokens(PROMPT.format(**fitted))
+
+
+def test_prompt_within_budget_is_unchanged():
+    original = inputs()
+    fitted, tokens = fit_prompt(PROMPT, original, node="Budget Test", budget=10_000)
+
+    assert fitted == original
+    assert tokens == rendered_tokens(original)
+    assert prompt_token_counts["Budget Test"]["last_tokens"] == tokens
+
+
+def test_old_feedback_is_dropped_first():
+    original = inputs(feedback_entries=400)
+    budget = rendered_tokens({**original, "feedback": original["feedback"][-20:]})
+    fitted, tokens = fit_prompt(PROMPT, original, budget=budget)
+
+    assert tokens <= budget
+    assert fitted["feedback"][0].endswith("older feedback entries omitted]")
+    assert fitted["feedback"][-1] == original["feedback"][-1]
+    assert fitted["previous_code"] == original["previous_code"]
+
+
+def test_code_not_mentioned_in_feedback_is_outlined():
+    original = inputs(code_lines=2000)
+    original["feedback"] = ["billing totals are wrong"]
+    fitted, tokens = fit_prompt(PROMPT, original, budget=rendered_tokens(original) // 2)
+
+    assert tokens <= rendered_tokens(original) // 2
+    assert "def auth_handler():" in fitted["previous_code"]
+    assert "value_1999" not in fitted["previous_code"].split("Filename: billing.py")[0]
+    assert "value_1999" in fitted["previous_code"].split("Filename: billing.py")[1]
+    assert "Previously written test cases" in fitted["old_test_cases"]
+
+
+def test_oversized_input_is_truncated_to_the_budget():
+    original = {"feedback": "", "old_test_cases": "", "previous_code": "x" * 100_000}
+    fitted, tokens = fit_prompt(PROMPT, original, budget=1000)
+
+    assert tokens <= 1000
+    assert "[truncated to fit the prompt budget]" in fitted["previous_code"]
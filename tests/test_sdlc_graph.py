@@ -0,0 +1,86 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_parser import parse_files_from_response
+from sdlc_graph import merge_changed_files, merge_test_cases
+
+
+CODE = """Project layout below.
+
+Filename: models.py
+Code:
+```python
+class User:
+    pass
+```
+
+Filename: requirements.txt
+Code:
+```text
+flask==3.0
+sqlalchemy
+```
+
+Filename: app.py
+Code:
+```python
+from models import User
+```
+"""
+
+
+def test_merge_changed_files_keeps_unchanged_blocks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    response = "Filename: app.py\nCode:\n```python\nfrom models import User\n\nUSERS = [User()]\n```"
+
+    state = merge_changed_files({"code": CODE}, response)
+
+    files = {file["filename"]: file["code"] for file in parse_files_from_response(state["code"])}
+    assert files == {"models.py": "class User:\n    pass", "app.py": "from models import User\n\nUSERS = [User()]"}
+    assert "Filename: requirements.txt\nCode:\n```text\nflask==3.0\nsqlalchemy\n```" in state["code"]
+    assert state["code"].startswith("Project layout below.")
+    assert state["code"].index("models.py") < state["code"].index("requirements.txt") < state["code"].index("app.py")
+    assert os.listdir(tmp_path / "generated_code") == ["app.py"]
+
+
+def test_merge_changed_files_appends_new_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    response = "Filename: auth.py\nCode:\n```python\nTOKEN_TTL = 60\n```"
+
+    state = merge_changed_files({"code": CODE}, response)
+
+    assert state["code"].startswith(CODE.rstrip())
+    assert [file["filename"] for file in parse_files_from_response(state["code"])] == ["models.py", "app.py", "auth.py"]
+
+
+def test_merge_changed_files_without_changes_keeps_code(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    response = "Filename: models.py\nCode:\n```python\nclass User:\n    pass\n```"
+
+    assert merge_changed_files({"code": CODE}, response)["code"] == CODE
+
+
+def test_merge_test_cases_deduplicates_by_name():
+    shards = [
+        "[Test Case Name]: Login succeeds\n[Steps]: valid password\n---\n[Test Case Name]: Login fails\n[Steps]: wrong password",
+        "[Test Case Name]: login  SUCCEEDS\n[Steps]: duplicate\n---\n[Test Case Name]: Logout\n[Steps]: click logout",
+    ]
+
+    merged = merge_test_cases(shards)
+
+    assert merged.split("\n---\n") == [
+        "[Test Case Name]: Login succeeds\n[Steps]: valid password",
+        "[Test Case Name]: Login fails\n[Steps]: wrong password",
+        "[Test Case Name]: Logout\n[Steps]: click logout",
+    ]
+
+
+def test_merge_test_cases_keeps_shards_without_names():
+    shards = ["[Test Case Name]: Login succeeds\n[Steps]: valid password", "1. Upload a file\n2. Delete it", "  "]
+
+    merged = merge_test_cases(shards)
+
+    assert merged == "[Test Case Name]: Login succeeds\n[Steps]: valid password\n---\n1. Upload a file\n2. Delete it"
+    assert merge_test_cases(["1. Upload a file"]) == "1. Upload a file"